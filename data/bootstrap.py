@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Bootstrap Confidence Intervals for Probability Presentation Datasets
+Vectorized resampling of the mean, quantiles and mode with batched index
+matrices spread across a process pool
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+The sample is sorted once. Each batch of resamples is then a single
+(batch, n) matrix of uniform indices into the sorted sample; sorting every
+row of that integer matrix (much faster than selecting on floats) puts each
+resample in ascending order, so:
+
+- its quantiles are plain column lookups, interpolated like np.percentile,
+- its mean is a cache-friendly monotone gather,
+- its histogram for the mode is one searchsorted of the bin edges per row,
+  smoothed with the full sample's kernel bandwidth (modes.smoothed_peaks).
+
+Resamples are generated in chunks of CHUNK_RESAMPLES, each chunk on its
+own spawned seed, so the replicates are identical for any number of worker
+processes. A batch holds about BATCH_ELEMENTS indices, which bounds the
+memory of each worker.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+import modes
+import quantiles
+import samplers
+
+# Indices per resampling matrix (32 MB of int64, 16 MB of int32)
+BATCH_ELEMENTS = 1 << 22
+
+# Resamples per seed chunk, the unit of work handed to the process pool
+CHUNK_RESAMPLES = 250
+
+# Sample and settings shared by every chunk, set once per worker process
+_shared = {}
+
+def _share(sorted_values, qs, mode_bins):
+    _shared['values'] = sorted_values
+    _shared['qs'] = qs
+    _shared['mode_bins'] = mode_bins
+
+def resample_indices(rng, n, batch):
+    """A (batch, n) matrix of uniform indices in [0, n)"""
+    dtype = np.int32 if n < 2 ** 31 else np.int64
+    return samplers.integers(0, n, out=np.empty((batch, n), dtype=dtype), rng=rng)
+
+def batch_statistics(sorted_values, indices, qs, mode_bins=None):
+    """
+    Mean, quantiles and mode of every resample in an index matrix.
+
+    indices is sorted in place. mode_bins is None or a dict with the
+    histogram geometry (low, width, n_bins) and kernel bandwidth.
+    """
+    n = sorted_values.size
+    indices.sort(axis=1)
+    resampled = sorted_values[indices]
+    result = {'mean': resampled.mean(axis=1)}
+
+    position = np.asarray(qs, dtype=float) * (n - 1)
+    lower = np.floor(position).astype(np.intp)
+    upper = np.minimum(lower + 1, n - 1)
+    result['quantiles'] = quantiles.lerp(resampled[:, lower], resampled[:, upper], position - lower)
+
+    if mode_bins is not None:
+        edges = mode_bins['low'] + mode_bins['width'] * np.arange(1, mode_bins['n_bins'])
+        counts = np.empty((len(indices), mode_bins['n_bins']))
+        for row, values in enumerate(resampled):
+            counts[row] = np.diff(np.searchsorted(values, edges), prepend=0, append=n)
+        result['mode'] = modes.smoothed_peaks(counts / n, mode_bins['low'], mode_bins['width'],
+                                              mode_bins['bandwidth'])[0]
+    return result
+
+def _run_chunk(seed_seq, n_resamples):
+    """Replicates of one seed chunk, on the sample shared with this process"""
+    values = _shared['values']
+    rng = np.random.default_rng(seed_seq)
+    batch = max(1, min(n_resamples, BATCH_ELEMENTS // values.size))
+    parts = []
+    for start in range(0, n_resamples, batch):
+        indices = resample_indices(rng, values.size, min(batch, n_resamples - start))
+        parts.append(batch_statistics(values, indices, _shared['qs'], _shared['mode_bins']))
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+def bootstrap(values, n_resamples=10000, qs=(), seed=None, workers=1, mode_estimator=None):
+    """
+    Bootstrap replicates of the mean, the quantiles qs and the mode.
+
+    Returns a dict of arrays: 'mean' (n_resamples,), 'quantiles'
+    (n_resamples, len(qs)) and, when a modes.ModeEstimator of the sample is
+    given, 'mode' (n_resamples,) on the same histogram bins and bandwidth.
+    """
+    sorted_values = np.sort(np.asarray(values, dtype=float).ravel())
+    if sorted_values.size == 0:
+        raise ValueError("bootstrap of an empty sample")
+    qs = np.asarray(qs, dtype=float)
+    mode_bins = None
+    if mode_estimator is not None and mode_estimator.max > mode_estimator.min:
+        mode_bins = {'low': mode_estimator.low, 'width': mode_estimator.width,
+                     'n_bins': mode_estimator.n_bins, 'bandwidth': mode_estimator.bandwidth()}
+
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    sizes = [min(CHUNK_RESAMPLES, n_resamples - start) for start in range(0, n_resamples, CHUNK_RESAMPLES)]
+    chunks = list(zip(seed_seq.spawn(len(sizes)), sizes))
+
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_share,
+                                 initargs=(sorted_values, qs, mode_bins)) as pool:
+            parts = list(pool.map(_run_chunk, *zip(*chunks)))
+    else:
+        _share(sorted_values, qs, mode_bins)
+        parts = [_run_chunk(chunk_seed, size) for chunk_seed, size in chunks]
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+def percentile_interval(replicates, confidence=0.95):
+    """
+    Percentile confidence interval from bootstrap replicates along axis 0.
+
+    Returns an array of shape replicates.shape[1:] + (2,) with the lower
+    and upper bound.
+    """
+    alpha = (1.0 - confidence) / 2.0
+    bounds = np.quantile(replicates, [alpha, 1.0 - alpha], axis=0)
+    return np.moveaxis(bounds, 0, -1)
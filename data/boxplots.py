@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Box Plot Aggregates for Probability Presentation Datasets
+Precomputed per-group quartiles, whiskers and outliers, and dictionary
+encoded categorical columns
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+Box statistics follow the matplotlib/seaborn convention: quartiles are
+linear percentiles (like np.percentile), whiskers reach the most extreme
+values within whis * IQR of the box, and everything beyond them is an
+outlier. Groups come from a pandas categorical groupby, so every
+combination of categories gets a box (empty ones have count 0), in the
+order of the category codes.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Smallest integer type that holds the category codes
+CODE_DTYPE = np.int8
+
+def encode_categorical(values, categories=None):
+    """
+    Dictionary-encode a column of labels.
+
+    Returns {'codes': int8 array, 'categories': [label, ...]} where
+    categories[codes[i]] == values[i]. categories fixes the order (and
+    may include labels that do not occur); by default labels are sorted.
+    """
+    categorical = pd.Categorical(values, categories=categories)
+    if len(categorical.categories) > np.iinfo(CODE_DTYPE).max:
+        raise ValueError("too many categories for int8 codes")
+    if (categorical.codes < 0).any():
+        raise ValueError("values contain labels outside the given categories")
+    return {
+        'codes': categorical.codes.astype(CODE_DTYPE),
+        'categories': [str(category) for category in categorical.categories],
+    }
+
+def _float_or_none(value):
+    return None if pd.isna(value) else float(value)
+
+def box_table(frame, value, by, whis=1.5):
+    """
+    Box statistics of frame[value] for every combination of the categorical
+    columns `by`.
+
+    Returns {'value', 'by', 'categories': {column: labels}, 'boxes': [...]}
+    where each box holds the category codes of its group plus count, mean,
+    q1, median, q3, whisker_low, whisker_high and outliers.
+    """
+    by = list(by)
+    frame = frame.assign(**{column: frame[column].astype('category') for column in by})
+    categories = [frame[column].cat.categories for column in by]
+    shape = tuple(len(labels) for labels in categories)
+    groups = frame.groupby(by, observed=False, sort=True)[value]
+
+    # Quartiles of every group, in the order of the flattened category codes
+    full_index = pd.MultiIndex.from_product(categories, names=by) if len(by) > 1 else categories[0]
+    quartiles = groups.quantile([0.25, 0.5, 0.75]).unstack().reindex(full_index)
+    q1, median, q3 = (quartiles[q].to_numpy(dtype=float) for q in (0.25, 0.5, 0.75))
+    counts = groups.size().reindex(full_index).fillna(0).to_numpy(dtype=int)
+    means = groups.mean().reindex(full_index).to_numpy(dtype=float)
+
+    # Fences of each row's group decide between whisker and outlier
+    group_id = np.ravel_multi_index([frame[column].cat.codes.to_numpy() for column in by], shape)
+    values = frame[value].to_numpy(dtype=float)
+    iqr = q3 - q1
+    inside = (values >= (q1 - whis * iqr)[group_id]) & (values <= (q3 + whis * iqr)[group_id])
+    whiskers = (pd.Series(values).where(inside).groupby(group_id).agg(['min', 'max'])
+                .reindex(range(len(q1))))
+
+    outlier_rows = np.flatnonzero(~inside)
+    outlier_rows = outlier_rows[np.lexsort((values[outlier_rows], group_id[outlier_rows]))]
+    outliers = np.split(values[outlier_rows],
+                        np.searchsorted(group_id[outlier_rows], np.arange(1, len(q1))))
+
+    boxes = []
+    for flat, codes in enumerate(np.ndindex(*shape)):
+        box = {column: int(code) for column, code in zip(by, codes)}
+        box.update({
+            'count': int(counts[flat]),
+            'mean': _float_or_none(means[flat]),
+            'q1': _float_or_none(q1[flat]),
+            'median': _float_or_none(median[flat]),
+            'q3': _float_or_none(q3[flat]),
+            'whisker_low': _float_or_none(whiskers['min'].iloc[flat]),
+            'whisker_high': _float_or_none(whiskers['max'].iloc[flat]),
+            'outliers': outliers[flat],
+        })
+        boxes.append(box)
+    return {
+        'value': value,
+        'by': by,
+        'categories': {column: [str(label) for label in labels] for column, labels in zip(by, categories)},
+        'boxes': boxes,
+    }
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Coin and Dice Simulation Engine for the Probability Presentation
+Experiment x flip matrices drawn in bounded chunks and tallied with
+bincount
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+An experiment is n_flips coin flips (or n_dice die rolls). Outcomes are
+never kept per experiment: each chunk of about CHUNK_ELEMENTS flips is
+reduced to one integer code per experiment and counted with np.bincount,
+so memory is bounded by the chunk, not by n_experiments, and 10**8
+experiments take seconds.
+
+Sequence codes put the first flip in the most significant bit, 1 = heads,
+so code 0b11110 is HHHHT. For a fair coin the flips of an experiment are
+the bits of a single uniform integer in [0, 2**n_flips), one draw per
+experiment; a biased coin draws the code from the exact sequence
+probabilities p**k * (1-p)**(n-k), also with one uniform per experiment.
+Head counts and dice sums are these tallies folded by the number of heads
+(or the sum) of each code. Experiments too long to enumerate fall back to
+popcounts of bit-packed flips (packed_flips.py) for a fair coin, binomial
+draws for a biased one and explicit (experiments, dice) roll matrices.
+"""
+
+import time
+import numpy as np
+
+import samplers
+from packed_flips import PackedFlips
+
+# Flips (or rolls) per drawn chunk
+CHUNK_ELEMENTS = 1 << 22
+
+# Longest sequence tallied code by code (2**24 counters)
+MAX_SEQUENCE_FLIPS = 24
+
+def chunk_sizes(n_experiments, per_experiment=1, chunk_elements=CHUNK_ELEMENTS):
+    """Experiments per chunk, so that each chunk holds about chunk_elements draws"""
+    step = max(1, chunk_elements // max(per_experiment, 1))
+    for start in range(0, n_experiments, step):
+        yield min(step, n_experiments - start)
+
+def flip_matrix(n_experiments, n_flips, p=0.5, rng=None):
+    """(n_experiments, n_flips) uint8 matrix of flips, 1 = heads"""
+    rng = samplers.get_rng(rng)
+    if p == 0.5:
+        return samplers.integers(0, 2, out=np.empty((n_experiments, n_flips), dtype=np.uint8), rng=rng)
+    return (rng.random((n_experiments, n_flips)) < p).view(np.uint8)
+
+def sequence_codes(flips):
+    """Code of every row of a flip matrix, first flip in the top bit"""
+    n_flips = flips.shape[-1]
+    if n_flips > 63:
+        raise ValueError("sequence codes hold at most 63 flips")
+    weights = np.left_shift(np.int64(1), np.arange(n_flips - 1, -1, -1, dtype=np.int64))
+    return flips.astype(np.int64) @ weights
+
+def sequence_heads(n_flips):
+    """Number of heads in every sequence code of n_flips flips"""
+    codes = np.arange(2 ** n_flips, dtype=np.int64)
+    heads = np.zeros(codes.size, dtype=np.intp)
+    for bit in range(n_flips):
+        heads += (codes >> bit) & 1
+    return heads
+
+def sequence_probabilities(n_flips, p=0.5):
+    """Probability of every sequence code of n_flips flips with P(heads) = p"""
+    heads = sequence_heads(n_flips)
+    return p ** heads * (1.0 - p) ** (n_flips - heads)
+
+def tally_sequences(n_experiments, n_flips, p=0.5, rng=None, chunk_elements=CHUNK_ELEMENTS):
+    """Counts of every sequence of n_flips flips, indexed by sequence code"""
+    if n_flips > MAX_SEQUENCE_FLIPS:
+        raise ValueError(f"at most {MAX_SEQUENCE_FLIPS} flips per tallied sequence")
+    rng = samplers.get_rng(rng)
+    counts = np.zeros(2 ** n_flips, dtype=np.int64)
+    probabilities = None if p == 0.5 else sequence_probabilities(n_flips, p)
+    for size in chunk_sizes(n_experiments, n_flips, chunk_elements):
+        if probabilities is None:
+            codes = samplers.integers(0, 2 ** n_flips, size, rng=rng)
+        else:
+            codes = samplers.categorical(probabilities, size, rng=rng)
+        counts += np.bincount(codes, minlength=counts.size)
+    return counts
+
+def tally_heads(n_experiments, n_flips, p=0.5, rng=None, chunk_elements=CHUNK_ELEMENTS):
+    """Counts of experiments with k = 0..n_flips heads"""
+    rng = samplers.get_rng(rng)
+    if n_flips <= MAX_SEQUENCE_FLIPS // 2:
+        sequences = tally_sequences(n_experiments, n_flips, p, rng, chunk_elements)
+        return np.bincount(sequence_heads(n_flips), weights=sequences, minlength=n_flips + 1).astype(np.int64)
+    counts = np.zeros(n_flips + 1, dtype=np.int64)
+    if p == 0.5:
+        # Long fair experiments: popcount of bit-packed raw generator words
+        for size in chunk_sizes(n_experiments, n_flips, chunk_elements):
+            counts += PackedFlips.random(size, n_flips, rng=rng).tally_heads()
+        return counts
+    for size in chunk_sizes(n_experiments, 1, chunk_elements):
+        counts += np.bincount(samplers.binomial(n_flips, p, size, rng=rng), minlength=counts.size)
+    return counts
+
+def roll_matrix(n_experiments, n_dice, sides=6, rng=None):
+    """(n_experiments, n_dice) uint8 matrix of die faces 1..sides"""
+    return samplers.integers(1, sides, out=np.empty((n_experiments, n_dice), dtype=np.uint8),
+                             endpoint=True, rng=rng)
+
+def roll_sums(n_dice, sides=6):
+    """Sum of the faces of every roll code (base-`sides` digits, face - 1)"""
+    codes = np.arange(sides ** n_dice, dtype=np.int64)
+    sums = np.full(codes.size, n_dice, dtype=np.intp)
+    for _ in range(n_dice):
+        sums += codes % sides
+        codes //= sides
+    return sums
+
+def tally_rolls(n_rolls, sides=6, rng=None, chunk_elements=CHUNK_ELEMENTS):
+    """Counts of every face of single rolls, indexed by face (index 0 is unused)"""
+    rng = samplers.get_rng(rng)
+    counts = np.zeros(sides + 1, dtype=np.int64)
+    for size in chunk_sizes(n_rolls, 1, chunk_elements):
+        counts += np.bincount(samplers.integers(1, sides, size, endpoint=True, rng=rng), minlength=counts.size)
+    return counts
+
+def tally_dice_sums(n_experiments, n_dice, sides=6, rng=None, chunk_elements=CHUNK_ELEMENTS):
+    """Counts of the sum of n_dice dice, indexed by the sum (0..n_dice * sides)"""
+    rng = samplers.get_rng(rng)
+    counts = np.zeros(n_dice * sides + 1, dtype=np.int64)
+    if sides ** n_dice <= 2 ** MAX_SEQUENCE_FLIPS:
+        # One uniform roll code per experiment, folded into sums at the end
+        rolls = np.zeros(sides ** n_dice, dtype=np.int64)
+        for size in chunk_sizes(n_experiments, n_dice, chunk_elements):
+            rolls += np.bincount(samplers.integers(0, rolls.size, size, rng=rng), minlength=rolls.size)
+        counts += np.bincount(roll_sums(n_dice, sides), weights=rolls, minlength=counts.size).astype(np.int64)
+        return counts
+    for size in chunk_sizes(n_experiments, n_dice, chunk_elements):
+        rolls = roll_matrix(size, n_dice, sides, rng)
+        sums = rolls[:, 0].astype(np.intp)
+        for column in range(1, n_dice):
+            sums += rolls[:, column]
+        counts += np.bincount(sums, minlength=counts.size)
+    return counts
+
+def main():
+    """Time the tallies at 10**8 experiments"""
+    n_experiments = 10 ** 8
+    rng = np.random.default_rng(42)
+    for label, tally in [
+        ("heads in 5 flips", lambda: tally_heads(n_experiments, 5, rng=rng)),
+        ("sequences of 6 flips", lambda: tally_sequences(n_experiments, 6, rng=rng)),
+        ("sequences of 6 biased flips", lambda: tally_sequences(n_experiments, 6, p=0.6, rng=rng)),
+        ("sums of 2 dice", lambda: tally_dice_sums(n_experiments, 2, rng=rng)),
+    ]:
+        start = time.perf_counter()
+        counts = tally()
+        print(f"{label:28s} {time.perf_counter() - start:6.2f} s  "
+              f"({counts.sum():,} experiments)")
+
+if __name__ == "__main__":
+    main()
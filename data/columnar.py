@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Binary Columnar Sidecars for Probability Presentation Datasets
+Stores the large numeric columns of each data/*.json file as .npy arrays
+and opens datasets lazily, memory-mapping only the columns that are used
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+"""
+
+import json
+import os
+import numpy as np
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Sidecars live in columns/<dataset stem>/: one <column path>.npy per column
+# plus meta.json, the JSON document with every column replaced by a reference.
+COLUMNS_DIR = 'columns'
+META_FILE = 'meta.json'
+COLUMN_KEY = '$column'
+
+def sidecar_dir(json_path):
+    """Directory holding the sidecars of a data/*.json file"""
+    directory, filename = os.path.split(json_path)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, COLUMNS_DIR, stem)
+
+def column_filename(column):
+    """File name of a column given as a dotted path, e.g. 'scatter_data.x'"""
+    return f'{column}.npy'
+
+def sidecar_files(json_path, columns):
+    """All sidecar files written for json_path (meta first, then columns)"""
+    directory = sidecar_dir(json_path)
+    return ([os.path.join(directory, META_FILE)] +
+            [os.path.join(directory, column_filename(column)) for column in columns])
+
+def split_columns(data, columns):
+    """
+    Separate the columns from a dataset document.
+
+    Returns (meta, arrays): meta is a copy of data in which every column is
+    replaced by a {"$column": file, "dtype": ..., "shape": [...]} reference,
+    and arrays maps each column file name to its contiguous ndarray.
+    """
+    meta = _copy_containers(data)
+    arrays = {}
+    for column in columns:
+        *parents, key = column.split('.')
+        node = meta
+        for parent in parents:
+            node = node[parent]
+        array = np.ascontiguousarray(node[key])
+        filename = column_filename(column)
+        node[key] = {
+            COLUMN_KEY: filename,
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+        }
+        arrays[filename] = array
+    return meta, arrays
+
+def _copy_containers(obj):
+    """Copy nested dicts so column references do not touch the original"""
+    if isinstance(obj, dict):
+        return {key: _copy_containers(value) for key, value in obj.items()}
+    return obj
+
+class LazyRecord:
+    """
+    Read-only view of a (nested) dataset document.
+
+    Plain fields come from the small meta.json; column references are opened
+    with np.load(mmap_mode='r') the first time they are accessed, so only
+    the pages of the columns actually touched are ever read from disk.
+    """
+
+    def __init__(self, fields, directory):
+        self._fields = fields
+        self._directory = directory
+        self._cache = {}
+
+    def __getitem__(self, key):
+        if key not in self._cache:
+            self._cache[key] = self._resolve(self._fields[key])
+        return self._cache[key]
+
+    def __getattr__(self, key):
+        if key.startswith('_'):
+            raise AttributeError(key)
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def keys(self):
+        return self._fields.keys()
+
+    def _resolve(self, value):
+        if isinstance(value, dict):
+            if COLUMN_KEY in value:
+                return np.load(os.path.join(self._directory, value[COLUMN_KEY]), mmap_mode='r')
+            return LazyRecord(value, self._directory)
+        return value
+
+    def __repr__(self):
+        return f'LazyRecord({list(self._fields)})'
+
+def open_dataset(name, data_dir=DATA_DIR):
+    """
+    Open a dataset by name, e.g. 'quantiles_data' or 'quantiles_data.json'.
+
+    Datasets with sidecars are opened lazily from their meta.json; datasets
+    without sidecars fall back to parsing the JSON file itself.
+    """
+    stem = os.path.splitext(os.path.basename(name))[0]
+    json_path = os.path.join(data_dir, stem + '.json')
+    directory = sidecar_dir(json_path)
+    meta_path = os.path.join(directory, META_FILE)
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            return LazyRecord(json.load(f), directory)
+    with open(json_path) as f:
+        return LazyRecord(json.load(f), directory)
+
+def load_column(name, column, data_dir=DATA_DIR):
+    """Memory-map a single column, e.g. load_column('dispersion_data', 'values')"""
+    record = open_dataset(name, data_dir)
+    for key in column.split('.'):
+        record = record[key]
+    return record
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Conditional Coin Experiments for the Probability Presentation
+Exact sampling given a prefix pattern and importance sampling for
+arbitrary prefix conditions
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+"What comes after HHHHH?" is a question about flips conditioned on a
+prefix. Drawing whole sequences and discarding those without the prefix
+(rejection) keeps only P(prefix) of them, 1/32 for five heads. Flips are
+independent, so conditioning on a fixed prefix leaves the later flips
+untouched: conditional_next_flip() fixes the prefix and draws only the
+flip after it, so every draw is a usable sample.
+
+A prefix condition may also contain wildcards ('HH?HH') or be any function
+of the prefix flips (e.g. "at least 4 heads"). importance_next_flip()
+draws the prefix from a tilted coin that favours the condition, weights
+every sequence by p(prefix) / q(prefix) and estimates
+
+    P(next = H | condition) = sum(w * A * H) / sum(w * A),
+
+with a delta-method standard error and the effective sample size of the
+weights. draws_for_precision() gives the number of random flips each
+method needs for a target standard error.
+"""
+
+import numpy as np
+
+import coins
+import samplers
+
+def parse_condition(pattern):
+    """'HT?H' -> array of 1 (heads), 0 (tails) and -1 (any)"""
+    codes = {'H': 1, 'T': 0, '?': -1}
+    if set(pattern) - set(codes):
+        raise ValueError("prefix patterns are strings of 'H', 'T' and '?'")
+    return np.array([codes[flip] for flip in pattern], dtype=np.int8)
+
+def pattern_probability(pattern, p=0.5):
+    """Probability that a sequence starts with pattern"""
+    bits = parse_condition(pattern)
+    return float(p ** np.sum(bits == 1) * (1.0 - p) ** np.sum(bits == 0))
+
+def _proportion(heads, total, draws):
+    """Estimate, binomial standard error and cost of a proportion of heads"""
+    probability = heads / total if total else float('nan')
+    standard_error = np.sqrt(probability * (1.0 - probability) / total) if total else float('nan')
+    return {'heads': int(heads), 'tails': int(total - heads), 'samples': int(total),
+            'probability': float(probability), 'standard_error': float(standard_error),
+            'draws': int(draws)}
+
+def rejection_next_flip(n_experiments, pattern, p=0.5, rng=None):
+    """
+    Next flip after pattern by rejection: draw whole sequences and keep
+    those that start with pattern.
+    """
+    bits = parse_condition(pattern)
+    n_flips = len(bits) + 1
+    if n_flips <= coins.MAX_SEQUENCE_FLIPS:
+        codes = np.arange(2 ** n_flips)
+        prefix = (codes[:, None] >> np.arange(n_flips - 1, 0, -1)) & 1
+        accepted = np.all((bits < 0) | (prefix == bits), axis=1)
+        counts = coins.tally_sequences(n_experiments, n_flips, p, rng)
+        heads = counts[accepted & (codes & 1 == 1)].sum()
+        total = counts[accepted].sum()
+    else:
+        flips = coins.flip_matrix(n_experiments, n_flips, p, rng)
+        accepted = np.all((bits < 0) | (flips[:, :-1] == bits), axis=1)
+        heads, total = flips[accepted, -1].sum(), accepted.sum()
+    return _proportion(heads, total, n_experiments * n_flips)
+
+def conditional_flips(n_experiments, pattern, n_after=1, p=0.5, rng=None):
+    """
+    (n_experiments, len(pattern) + n_after) flips drawn exactly from the
+    sequences that start with pattern: fixed positions are copied, only
+    the wildcards and the n_after following flips are drawn.
+    """
+    bits = parse_condition(pattern)
+    free = np.flatnonzero(bits < 0)
+    flips = np.empty((n_experiments, len(bits) + n_after), dtype=np.uint8)
+    flips[:, :len(bits)] = np.maximum(bits, 0)
+    if free.size:
+        flips[:, free] = coins.flip_matrix(n_experiments, free.size, p, rng)
+    flips[:, len(bits):] = coins.flip_matrix(n_experiments, n_after, p, rng)
+    return flips
+
+def conditional_next_flip(n_experiments, pattern, p=0.5, rng=None):
+    """Next flip after pattern, sampled directly from the conditioned space"""
+    bits = parse_condition(pattern)
+    flips = conditional_flips(n_experiments, pattern, 1, p, rng)
+    heads = int(flips[:, -1].sum())
+    return _proportion(heads, n_experiments, n_experiments * (1 + np.sum(bits < 0)))
+
+def importance_next_flip(n_samples, condition, n_prefix=None, p=0.5, tilt=0.95, rng=None):
+    """
+    Self-normalized importance sampling estimate of P(next = H | condition).
+
+    condition is a prefix pattern ('HH?HH') or a function mapping an
+    (n, n_prefix) 0/1 flip matrix to a boolean array. Fixed pattern
+    positions are drawn with P(match) = tilt and wildcards from the true
+    coin (likelihood ratio 1); every prefix flip of a function condition is
+    drawn with P(heads) = tilt. The flip after the prefix is drawn from the
+    true coin.
+    """
+    rng = samplers.get_rng(rng)
+    if callable(condition):
+        if n_prefix is None:
+            raise ValueError("n_prefix is required for a function condition")
+        bits = np.full(n_prefix, -1, dtype=np.int8)
+        q_heads = np.full(n_prefix, tilt)
+    else:
+        bits = parse_condition(condition)
+        q_heads = np.where(bits == 1, tilt, np.where(bits == 0, 1.0 - tilt, p))
+    prefix = (rng.random((n_samples, len(bits))) < q_heads).view(np.uint8)
+    following = coins.flip_matrix(n_samples, 1, p, rng)[:, 0]
+
+    if callable(condition):
+        accepted = np.asarray(condition(prefix), dtype=bool)
+    else:
+        accepted = np.all((bits < 0) | (prefix == bits), axis=1)
+    # log p(prefix) - log q(prefix), flip by flip
+    log_ratio = np.where(prefix == 1, np.log(p) - np.log(q_heads), np.log1p(-p) - np.log1p(-q_heads))
+    weights = np.exp(log_ratio.sum(axis=1)) * accepted
+
+    total = weights.sum()
+    estimate = float(np.dot(weights, following) / total) if total > 0 else float('nan')
+    standard_error = float(np.sqrt(np.sum(weights ** 2 * (following - estimate) ** 2)) / total) \
+        if total > 0 else float('nan')
+    return {
+        'probability': estimate,
+        'standard_error': standard_error,
+        'condition_probability': float(total / n_samples),
+        'accepted': int(accepted.sum()),
+        'effective_samples': float(total ** 2 / np.sum(weights ** 2)) if total > 0 else 0.0,
+        'draws': int(n_samples * (len(bits) + 1)),
+    }
+
+def draws_for_precision(standard_error, pattern, p=0.5, method='conditional'):
+    """
+    Random flips needed to estimate P(next = H | pattern) to the given
+    standard error, by 'conditional' sampling or by 'rejection'.
+    """
+    samples = int(np.ceil(p * (1.0 - p) / standard_error ** 2))
+    bits = parse_condition(pattern)
+    if method == 'conditional':
+        return samples * int(1 + np.sum(bits < 0))
+    if method == 'rejection':
+        return int(np.ceil(samples / pattern_probability(pattern, p))) * (len(bits) + 1)
+    raise ValueError("method must be 'conditional' or 'rejection'")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Contour Lines for Probability Presentation Datasets
+Vectorized marching squares over a density grid given by two 1-D axes
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+"""
+
+import numpy as np
+
+# Cell corners: 0 = (x[j], y[i]), 1 = (x[j+1], y[i]), 2 = (x[j+1], y[i+1]),
+# 3 = (x[j], y[i+1]). Cell edges: 0 = bottom (0-1), 1 = right (1-2),
+# 2 = top (3-2), 3 = left (0-3). The case index sets bit k when corner k is
+# above the level; each case maps to up to two (edge, edge) segments.
+_NONE = (-1, -1)
+_SEGMENTS = [
+    [_NONE, _NONE],      # 0
+    [(3, 0), _NONE],     # 1
+    [(0, 1), _NONE],     # 2
+    [(3, 1), _NONE],     # 3
+    [(1, 2), _NONE],     # 4
+    [(3, 0), (1, 2)],    # 5  saddle, centre below the level
+    [(0, 2), _NONE],     # 6
+    [(3, 2), _NONE],     # 7
+    [(2, 3), _NONE],     # 8
+    [(0, 2), _NONE],     # 9
+    [(0, 1), (2, 3)],    # 10 saddle, centre below the level
+    [(1, 2), _NONE],     # 11
+    [(1, 3), _NONE],     # 12
+    [(0, 1), _NONE],     # 13
+    [(3, 0), _NONE],     # 14
+    [_NONE, _NONE],      # 15
+]
+SEGMENT_TABLE = np.array(_SEGMENTS)
+
+# When the cell centre is above the level the saddle corners connect the
+# other way round
+SEGMENT_TABLE_CENTRE_ABOVE = SEGMENT_TABLE.copy()
+SEGMENT_TABLE_CENTRE_ABOVE[5] = [(0, 1), (2, 3)]
+SEGMENT_TABLE_CENTRE_ABOVE[10] = [(3, 0), (1, 2)]
+
+def _crossing(v_from, v_to, level):
+    """Fraction along an edge where the level is crossed (0.5 on flat edges)"""
+    delta = v_to - v_from
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(delta != 0, (level - v_from) / delta, 0.5)
+    return np.clip(t, 0.0, 1.0)
+
+def marching_squares(x, y, z, level):
+    """
+    Contour segments of z at a single level.
+
+    x has shape (nx,), y has shape (ny,) and z has shape (ny, nx), i.e.
+    z[i, j] is the value at (x[j], y[i]) as produced by np.meshgrid(x, y).
+    Returns an array of shape (n_segments, 4) holding x0, y0, x1, y1.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    z = np.asarray(z, dtype=float)
+    v0 = z[:-1, :-1]
+    v1 = z[:-1, 1:]
+    v2 = z[1:, 1:]
+    v3 = z[1:, :-1]
+
+    case = ((v0 > level).astype(np.uint8) | (v1 > level) << 1 |
+            (v2 > level) << 2 | (v3 > level) << 3)
+    active = (case != 0) & (case != 15)
+    if not active.any():
+        return np.empty((0, 4))
+
+    rows, cols = np.nonzero(active)
+    v0, v1, v2, v3 = v0[rows, cols], v1[rows, cols], v2[rows, cols], v3[rows, cols]
+    case = case[rows, cols]
+    x_left, x_right = x[cols], x[cols + 1]
+    y_bottom, y_top = y[rows], y[rows + 1]
+
+    # Crossing point on each of the four edges, shape (n_cells, 4, 2)
+    t0 = _crossing(v0, v1, level)
+    t1 = _crossing(v1, v2, level)
+    t2 = _crossing(v3, v2, level)
+    t3 = _crossing(v0, v3, level)
+    points = np.stack([
+        np.stack([x_left + t0 * (x_right - x_left), y_bottom], axis=-1),
+        np.stack([x_right, y_bottom + t1 * (y_top - y_bottom)], axis=-1),
+        np.stack([x_left + t2 * (x_right - x_left), y_top], axis=-1),
+        np.stack([x_left, y_bottom + t3 * (y_top - y_bottom)], axis=-1),
+    ], axis=1)
+
+    centre_above = (v0 + v1 + v2 + v3) / 4 > level
+    table = np.where(centre_above[:, None, None],
+                     SEGMENT_TABLE_CENTRE_ABOVE[case], SEGMENT_TABLE[case])
+
+    segments = []
+    cells = np.arange(len(case))
+    for slot in range(2):
+        start, end = table[:, slot, 0], table[:, slot, 1]
+        valid = start >= 0
+        segments.append(np.concatenate([points[cells[valid], start[valid]],
+                                        points[cells[valid], end[valid]]], axis=1))
+    return np.concatenate(segments)
+
+def contour_lines(x, y, z, levels):
+    """Marching-squares segments for every level, as a list of dicts"""
+    return [{'level': float(level), 'segments': marching_squares(x, y, z, level)}
+            for level in levels]
@@ -11,37 +11,140 @@ import numpy as np
 import pandas as pd
 import json
 import os
-from scipy import stats
+import argparse
+import filecmp
+import glob
+import hashlib
+import inspect
+import re
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-# Set random seed for reproducibility
-np.random.seed(42)
+import json_writer
+import columnar
+import contours
+import kde
+import tiles
+import boxplots
+import moments
+import quantiles
+import modes
+import bootstrap
+import samplers
+import pipeline
+from pipeline import SampleSpec
 
-def generate_coin_flip_data():
+# Root seed for reproducibility. Every dataset draws from its own child
+# stream spawned from this seed, so outputs do not depend on the order in
+# which (or the process in which) the generators run.
+SEED = 42
+
+# Build manifest recording what every dataset was last generated from
+MANIFEST_FILE = 'build_manifest.json'
+
+# Output options shared by every generator in this process (and copied into
+# every worker of the process pool). See configure_output().
+OUTPUT_OPTIONS = {
+    'precision': None,  # significant digits for floats, None = full precision
+    'encoding': 'json',  # 'json' for decimal text, 'typed' for base64 typed arrays
+}
+
+# Large numeric columns (dotted paths) that are also written as memory-mappable
+# .npy sidecars next to their JSON file, see columnar.py
+SIDECAR_COLUMNS = {
+    'central_tendency_normal.json': ['values'],
+    'central_tendency_skewed.json': ['values'],
+    'quantiles_data.json': ['values'],
+    'dispersion_data.json': ['values'],
+    'advanced_visualization_data.json': ['scatter_data.x', 'scatter_data.y', 'contour_data.density'],
+}
+
+# Level-of-detail files of the advanced visualization scatter plot, coarsest
+# (8 x 8 cells) to finest (256 x 256 cells)
+LOD_FILES = [f'advanced_visualization_lod{level}.json' for level in range(6)]
+
+def configure_output(precision=None, encoding='json'):
+    """Set the output options used by write_json in this process"""
+    OUTPUT_OPTIONS['precision'] = precision
+    OUTPUT_OPTIONS['encoding'] = encoding
+
+def write_if_changed(path, write, mode='w'):
+    """
+    Write a file through write(f), touching it only when its bytes change.
+    
+    The content is written to a temporary file in the same directory and
+    then either swapped into place or discarded, so unchanged outputs keep
+    their mtime (and downstream caches stay valid).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates owner-only files
+        if os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False):
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_json(path, data):
+    """Write data as compact JSON, plus .npy sidecars for its SIDECAR_COLUMNS"""
+    precision = OUTPUT_OPTIONS['precision']
+    typed_arrays = OUTPUT_OPTIONS['encoding'] == 'typed'
+    write_if_changed(path, lambda f: json_writer.dump(data, f, precision=precision,
+                                                      typed_arrays=typed_arrays))
+    
+    columns = SIDECAR_COLUMNS.get(os.path.basename(path))
+    if columns:
+        meta, arrays = columnar.split_columns(data, columns)
+        directory = columnar.sidecar_dir(path)
+        write_if_changed(os.path.join(directory, columnar.META_FILE),
+                         lambda f: json_writer.dump(meta, f, precision=precision))
+        for filename, array in arrays.items():
+            write_if_changed(os.path.join(directory, filename),
+                             lambda f: np.save(f, array, allow_pickle=False), mode='wb')
+        # Drop sidecars of columns that are no longer exported
+        for filename in os.listdir(directory):
+            if filename.endswith('.npy') and filename not in arrays:
+                os.remove(os.path.join(directory, filename))
+
+def draw_skewnorm(rng, size, a):
+    """Skew-normal draws with shape parameter a (a=0 is the standard normal)"""
+    return samplers.skewnorm(a, size=size, rng=rng)
+
+def generate_coin_flip_data(rng):
     """Generate data for law of large numbers demonstration"""
     ns = np.array([2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096])
-    heads_count = [np.random.binomial(n, 0.5) for n in ns]
+    heads_count = samplers.binomial(ns, 0.5, rng=rng)
     proportion_heads = np.array(heads_count) / ns
     
     data = {
-        'n_flips': ns.tolist(),
+        'n_flips': ns,
         'heads_count': heads_count,
-        'proportion_heads': proportion_heads.tolist(),
+        'proportion_heads': proportion_heads,
         'expected_value': 0.5
     }
     
-    with open('coin_flip_law_of_large_numbers.json', 'w') as f:
-        json.dump(data, f, indent=2)
+    write_json('coin_flip_law_of_large_numbers.json', data)
     
     return data
 
-def generate_probability_distribution_data():
+def generate_probability_distribution_data(rng, n_experiments=1000):
     """Generate data for 5-coin flip probability distribution"""
-    n_experiments = 1000
-    heads_count = np.random.binomial(5, 0.5, n_experiments)
+    heads_count = samplers.binomial(5, 0.5, n_experiments, rng=rng)
     
-    heads, event_count = np.unique(heads_count, return_counts=True)
+    # Every k = 0..5, even those no experiment produced
+    heads = np.arange(6)
+    event_count = np.bincount(heads_count, minlength=6)
     event_proba = event_count / n_experiments
     
     # Theoretical probabilities
@@ -53,133 +156,204 @@ def generate_probability_distribution_data():
     theoretical_proba = [coinflip_prob(5, x) for x in range(6)]
     
     data = {
-        'heads_values': heads.tolist(),
-        'observed_counts': event_count.tolist(),
-        'observed_probabilities': event_proba.tolist(),
+        'heads_values': heads,
+        'observed_counts': event_count,
+        'observed_probabilities': event_proba,
         'theoretical_probabilities': theoretical_proba,
         'n_experiments': n_experiments
     }
     
-    with open('probability_distribution_5_coins.json', 'w') as f:
-        json.dump(data, f, indent=2)
+    write_json('probability_distribution_5_coins.json', data)
     
     return data
 
-def generate_central_tendency_data():
-    """Generate data for central tendency measures"""
+def generate_central_tendency_data(rng, normal, skewed, curve_points=256):
+    """
+    Generate data for central tendency measures
+    
+    normal and skewed are the shared 'normal' and 'skewed' SampleSummary
+    objects (see SAMPLES). The mean, median and mode describe the whole
+    sample; the mode is the peak of the smoothed histogram, reported with
+    its bandwidth and standard error. The density curve uses the exported
+    values.
+    """
     # Normal distribution (no skew)
-    x_normal = stats.skewnorm.rvs(0, size=1000)
+    x_normal = normal.values
     
     # Skewed distribution
-    x_skewed = stats.skewnorm.rvs(10, size=1000)
+    x_skewed = skewed.values
+    
+    normal_mode = normal.mode()
+    skewed_mode = skewed.mode()
+    
+    # Smooth density curves (binned KDE)
+    normal_grid, normal_density = kde.density_curve(x_normal, curve_points)
+    skewed_grid, skewed_density = kde.density_curve(x_skewed, curve_points)
     
     normal_data = {
-        'values': x_normal.tolist(),
-        'mean': float(np.mean(x_normal)),
-        'median': float(np.median(x_normal)),
-        'mode': float(stats.mode(x_normal)[0]),
+        'values': x_normal,
+        'n_samples': normal.moments.count,
+        'mean': normal.moments.mean,
+        'median': float(normal.percentiles([50])[0]),
+        'mode': normal_mode['mode'],
+        'mode_uncertainty': {key: normal_mode[key] for key in ('bandwidth', 'standard_error', 'bin_width')},
+        'density_curve': {'x': normal_grid, 'density': normal_density},
         'distribution_type': 'normal'
     }
     
     skewed_data = {
-        'values': x_skewed.tolist(),
-        'mean': float(np.mean(x_skewed)),
-        'median': float(np.median(x_skewed)),
-        'mode': float(stats.mode(x_skewed)[0]),
+        'values': x_skewed,
+        'n_samples': skewed.moments.count,
+        'mean': skewed.moments.mean,
+        'median': float(skewed.percentiles([50])[0]),
+        'mode': skewed_mode['mode'],
+        'mode_uncertainty': {key: skewed_mode[key] for key in ('bandwidth', 'standard_error', 'bin_width')},
+        'density_curve': {'x': skewed_grid, 'density': skewed_density},
         'distribution_type': 'skewed'
     }
     
-    with open('central_tendency_normal.json', 'w') as f:
-        json.dump(normal_data, f, indent=2)
+    # Bootstrap intervals, when the samples were drawn with a bootstrap
+    for data, summary in [(normal_data, normal), (skewed_data, skewed)]:
+        intervals = summary.confidence_intervals([50])
+        if intervals is not None:
+            intervals['median'] = intervals.pop('percentiles')[0]
+            data['confidence_intervals'] = intervals
     
-    with open('central_tendency_skewed.json', 'w') as f:
-        json.dump(skewed_data, f, indent=2)
+    write_json('central_tendency_normal.json', normal_data)
+    write_json('central_tendency_skewed.json', skewed_data)
     
     return normal_data, skewed_data
 
-def generate_quantiles_data():
-    """Generate data for quantiles demonstration"""
-    x = stats.skewnorm.rvs(10, size=1000)
-    
-    # Percentiles
-    percentiles = np.percentile(x, [95, 99])
-    
-    # Quartiles
-    quartiles = np.percentile(x, [25, 50, 75])
-    
-    # Deciles
-    deciles = np.percentile(x, range(10, 100, 10))
+def generate_quantiles_data(rng, skewed):
+    """
+    Generate data for quantiles demonstration
+    
+    All percentiles of the shared 'skewed' sample are computed together:
+    exactly from one partition pass when it was drawn as a single block, or
+    from its quantile sketch (with the rank error bound) otherwise. With a
+    bootstrap, every reported percentile also gets a confidence interval.
+    """
+    summary = skewed
+    
+    # Percentiles, quartiles and deciles in a single pass
+    requested = [95, 99] + [25, 50, 75] + list(range(10, 100, 10)) + [0, 100]
+    result = summary.percentiles(requested)
+    percentiles = result[0:2]
+    quartiles = result[2:5]
+    deciles = result[5:14]
     
     data = {
-        'values': x.tolist(),
-        'percentiles_95_99': percentiles.tolist(),
-        'quartiles': quartiles.tolist(),
-        'deciles': deciles.tolist(),
-        'min_value': float(np.min(x)),
-        'max_value': float(np.max(x))
+        'values': summary.values,
+        'n_samples': summary.moments.count,
+        'percentiles_95_99': percentiles,
+        'quartiles': quartiles,
+        'deciles': deciles,
+        'min_value': float(result[14]),
+        'max_value': float(result[15]),
+        'quantile_method': summary.quantile_info()
     }
     
-    with open('quantiles_data.json', 'w') as f:
-        json.dump(data, f, indent=2)
+    intervals = summary.confidence_intervals(requested[:14])
+    if intervals is not None:
+        bounds = intervals['percentiles']
+        data['confidence_intervals'] = {
+            'n_resamples': intervals['n_resamples'],
+            'confidence': intervals['confidence'],
+            'percentiles_95_99': bounds[0:2],
+            'quartiles': bounds[2:5],
+            'deciles': bounds[5:14],
+        }
+    
+    write_json('quantiles_data.json', data)
     
     return data
 
-def generate_boxplot_data():
-    """Generate data for box plot demonstration"""
-    # Load iris dataset equivalent
-    np.random.seed(42)
+def generate_boxplot_data(rng):
+    """
+    Generate data for box plot demonstration
     
+    Besides the raw columns (with day and smoker dictionary-encoded), every
+    group's quartiles, whiskers and outliers are precomputed in box_stats.
+    """
     # Generate synthetic iris-like data
-    setosa_sepal_length = np.random.normal(5.0, 0.3, 50)
-    versicolor_sepal_length = np.random.normal(5.9, 0.5, 50)
-    virginica_sepal_length = np.random.normal(6.6, 0.6, 50)
+    setosa_sepal_length = samplers.normal(5.0, 0.3, 50, rng=rng)
+    versicolor_sepal_length = samplers.normal(5.9, 0.5, 50, rng=rng)
+    virginica_sepal_length = samplers.normal(6.6, 0.6, 50, rng=rng)
     
-    setosa_sepal_width = np.random.normal(3.4, 0.4, 50)
-    versicolor_sepal_width = np.random.normal(2.8, 0.3, 50)
-    virginica_sepal_width = np.random.normal(3.0, 0.3, 50)
+    setosa_sepal_width = samplers.normal(3.4, 0.4, 50, rng=rng)
+    versicolor_sepal_width = samplers.normal(2.8, 0.3, 50, rng=rng)
+    virginica_sepal_width = samplers.normal(3.0, 0.3, 50, rng=rng)
     
     data = {
         'iris_data': {
             'setosa': {
-                'sepal_length': setosa_sepal_length.tolist(),
-                'sepal_width': setosa_sepal_width.tolist()
+                'sepal_length': setosa_sepal_length,
+                'sepal_width': setosa_sepal_width
             },
             'versicolor': {
-                'sepal_length': versicolor_sepal_length.tolist(),
-                'sepal_width': versicolor_sepal_width.tolist()
+                'sepal_length': versicolor_sepal_length,
+                'sepal_width': versicolor_sepal_width
             },
             'virginica': {
-                'sepal_length': virginica_sepal_length.tolist(),
-                'sepal_width': virginica_sepal_width.tolist()
+                'sepal_length': virginica_sepal_length,
+                'sepal_width': virginica_sepal_width
             }
         }
     }
     
     # Generate tips-like data
-    total_bills = np.random.exponential(15, 244) + 5
-    tips = total_bills * np.random.normal(0.15, 0.05, 244)
-    days = np.random.choice(['Thu', 'Fri', 'Sat', 'Sun'], 244)
-    smoker = np.random.choice(['Yes', 'No'], 244)
-    
+    total_bills = samplers.exponential(15, 244, rng=rng) + 5
+    tips = total_bills * samplers.normal(0.15, 0.05, 244, rng=rng)
+    days = samplers.choice(['Thu', 'Fri', 'Sat', 'Sun'], 244, rng=rng)
+    smoker = samplers.choice(['Yes', 'No'], 244, rng=rng)
+    
+    # Categorical columns as int8 codes plus their labels
+    day = boxplots.encode_categorical(days, categories=['Thu', 'Fri', 'Sat', 'Sun'])
+    smoker = boxplots.encode_categorical(smoker, categories=['Yes', 'No'])
     data['tips_data'] = {
-        'total_bill': total_bills.tolist(),
-        'tip': tips.tolist(),
-        'day': days.tolist(),
-        'smoker': smoker.tolist()
+        'total_bill': total_bills,
+        'tip': tips,
+        'day': day,
+        'smoker': smoker
+    }
+    
+    # Precomputed boxes, so the slide draws a few dozen numbers per group
+    iris = pd.concat([
+        pd.DataFrame({'species': species, **measurements})
+        for species, measurements in data['iris_data'].items()
+    ], ignore_index=True)
+    iris['species'] = pd.Categorical(iris['species'], categories=list(data['iris_data']))
+    tips_frame = pd.DataFrame({
+        'total_bill': total_bills,
+        'tip': tips,
+        'day': pd.Categorical.from_codes(day['codes'], day['categories']),
+        'smoker': pd.Categorical.from_codes(smoker['codes'], smoker['categories']),
+    })
+    data['box_stats'] = {
+        'iris_sepal_length': boxplots.box_table(iris, 'sepal_length', ['species']),
+        'iris_sepal_width': boxplots.box_table(iris, 'sepal_width', ['species']),
+        'tips_tip_by_day_smoker': boxplots.box_table(tips_frame, 'tip', ['day', 'smoker']),
+        'tips_total_bill_by_day_smoker': boxplots.box_table(tips_frame, 'total_bill', ['day', 'smoker']),
     }
     
-    with open('boxplot_data.json', 'w') as f:
-        json.dump(data, f, indent=2)
+    write_json('boxplot_data.json', data)
     
     return data
 
-def generate_dispersion_data():
-    """Generate data for measures of dispersion"""
-    x = stats.skewnorm.rvs(10, size=1000)
+def generate_dispersion_data(rng, skewed):
+    """
+    Generate data for measures of dispersion
     
-    mean_val = np.mean(x)
-    variance = np.var(x)
-    std_dev = np.std(x)
+    The statistics are the streaming moments of the shared 'skewed' sample,
+    so n_samples is not limited by memory; only its exported values are
+    written as raw data.
+    """
+    moments = skewed.moments
+    x = skewed.values
+    
+    mean_val = moments.mean
+    variance = moments.variance()
+    std_dev = moments.std()
     
     # Calculate standard deviation bands
     std_bands = {
@@ -191,98 +365,434 @@ def generate_dispersion_data():
     }
     
     data = {
-        'values': x.tolist(),
+        'values': x,
+        'n_samples': moments.count,
         'mean': float(mean_val),
         'variance': float(variance),
         'standard_deviation': float(std_dev),
+        'skewness': moments.skewness(),
+        'kurtosis': moments.kurtosis(),
         'std_bands': std_bands
     }
     
-    with open('dispersion_data.json', 'w') as f:
-        json.dump(data, f, indent=2)
+    write_json('dispersion_data.json', data)
     
     return data
 
-def generate_advanced_visualization_data():
-    """Generate complex data for D3.js visualization"""
+def generate_advanced_visualization_data(rng, n_points=500, grid_size=50, contour_levels=None,
+                                         max_scatter_points=10000, lod_sample_size=2000):
+    """
+    Generate complex data for D3.js visualization
+    
+    The density surface is stored as two 1-D axes plus the (grid_size,
+    grid_size) density grid; consumers rebuild the mesh with
+    np.meshgrid(x_axis, y_axis). contour_levels, given as fractions of the
+    peak density, adds precomputed marching-squares contour lines.
+    
+    The scatter plot is also written as a level-of-detail pyramid, one file
+    per zoom level (LOD_FILES) with grid counts, per-category counts and a
+    stratified subsample of lod_sample_size points. Above max_scatter_points
+    the main file keeps only the finest level's subsample instead of every
+    raw point, so its size no longer grows with n_points.
+    """
     # Generate multi-dimensional probability data
-    n_points = 500
     
     # Create correlated variables
     mean = [0, 0]
     cov = [[1, 0.7], [0.7, 1]]
-    x, y = np.random.multivariate_normal(mean, cov, n_points).T
+    x, y = samplers.multivariate_normal(mean, cov, n_points, rng=rng).T
     
     # Add categorical variable
-    categories = np.random.choice(['A', 'B', 'C'], n_points, p=[0.4, 0.35, 0.25])
-    
-    # Create probability density estimation
-    from scipy.stats import gaussian_kde
-    kde = gaussian_kde([x, y])
-    
-    # Create grid for contour plot
-    xi = np.linspace(x.min(), x.max(), 50)
-    yi = np.linspace(y.min(), y.max(), 50)
-    Xi, Yi = np.meshgrid(xi, yi)
-    zi = kde(np.vstack([Xi.ravel(), Yi.ravel()]))
+    labels = ['A', 'B', 'C']
+    codes = samplers.categorical([0.4, 0.35, 0.25], n_points, rng=rng)
+    categories = np.array(labels)[codes]
+    
+    # Create probability density estimation on the contour grid
+    # (binned FFT KDE, same bandwidth as scipy's gaussian_kde)
+    xi = np.linspace(x.min(), x.max(), grid_size)
+    yi = np.linspace(y.min(), y.max(), grid_size)
+    zi = kde.kde_2d(x, y, xi, yi)
+    
+    contour_data = {
+        'x_axis': xi,
+        'y_axis': yi,
+        'density': zi
+    }
+    if contour_levels:
+        levels = [fraction * zi.max() for fraction in contour_levels]
+        lines = contours.contour_lines(xi, yi, zi, levels)
+        for line, fraction in zip(lines, contour_levels):
+            line['relative_level'] = fraction
+        contour_data['contour_lines'] = lines
+    
+    # Level-of-detail pyramid, one file per zoom level
+    levels = tiles.lod_pyramid(x, y, codes, labels, rng, n_levels=len(LOD_FILES),
+                               sample_size=lod_sample_size)
+    for level, filename in zip(levels, LOD_FILES):
+        write_json(filename, level)
+    lod_index = [{'level': level['level'], 'grid_size': level['grid_size'], 'file': filename,
+                  'n_cells': len(level['cells']), 'n_sample': len(level['sample']['x'])}
+                 for level, filename in zip(levels, LOD_FILES)]
+    
+    if n_points > max_scatter_points:
+        sample = levels[-1]['sample']
+        scatter_data = {
+            'x': sample['x'],
+            'y': sample['y'],
+            'category': np.array(labels)[sample['category']],
+            'sampled': True
+        }
+    else:
+        scatter_data = {
+            'x': x,
+            'y': y,
+            'category': categories
+        }
     
     data = {
-        'scatter_data': {
-            'x': x.tolist(),
-            'y': y.tolist(),
-            'category': categories.tolist()
-        },
-        'contour_data': {
-            'x_grid': Xi.tolist(),
-            'y_grid': Yi.tolist(),
-            'density': zi.reshape(Xi.shape).tolist()
-        },
-        'correlation': float(np.corrcoef(x, y)[0, 1])
+        'scatter_data': scatter_data,
+        'contour_data': contour_data,
+        'correlation': float(np.corrcoef(x, y)[0, 1]),
+        'n_points': n_points,
+        'lod': lod_index
     }
     
-    with open('advanced_visualization_data.json', 'w') as f:
-        json.dump(data, f, indent=2)
+    write_json('advanced_visualization_data.json', data)
     
     return data
 
-def main():
+Dataset = namedtuple('Dataset', ['name', 'generator', 'message', 'outputs', 'params', 'samples'])
+
+# Shared samples, drawn once per build and streamed through the fused
+# statistics of pipeline.SampleSummary. A dataset that lists a sample in
+# `samples` receives its summary as the keyword argument of the same name.
+SAMPLES = [
+    SampleSpec('normal', draw_skewnorm, {'a': 0}),
+    SampleSpec('skewed', draw_skewnorm, {'a': 10}),
+]
+SAMPLES_BY_NAME = {spec.name: spec for spec in SAMPLES}
+
+# Spawn key of the root stream the sample seeds are spawned from, far away
+# from the dataset children so adding datasets never shifts the samples
+SAMPLE_STREAM_KEY = 2 ** 16
+
+# Registry of dataset generators, in spawn order. Each entry gets the child
+# seed at its own index, so adding a dataset at the end never changes the
+# streams (and therefore the bytes) of the existing ones. `params` are passed
+# to the generator as keyword arguments on top of its defaults.
+DATASETS = [
+    Dataset('coin_flip', generate_coin_flip_data, "coin flip data",
+            ['coin_flip_law_of_large_numbers.json'], {}, ()),
+    Dataset('probability_distribution', generate_probability_distribution_data, "probability distribution data",
+            ['probability_distribution_5_coins.json'], {}, ()),
+    Dataset('central_tendency', generate_central_tendency_data, "central tendency data",
+            ['central_tendency_normal.json', 'central_tendency_skewed.json'], {}, ('normal', 'skewed')),
+    Dataset('quantiles', generate_quantiles_data, "quantiles data",
+            ['quantiles_data.json'], {}, ('skewed',)),
+    Dataset('boxplot', generate_boxplot_data, "boxplot data",
+            ['boxplot_data.json'], {}, ()),
+    Dataset('dispersion', generate_dispersion_data, "dispersion data",
+            ['dispersion_data.json'], {}, ('skewed',)),
+    Dataset('advanced_visualization', generate_advanced_visualization_data, "advanced visualization data",
+            ['advanced_visualization_data.json'] + LOD_FILES,
+            {'contour_levels': [0.1, 0.3, 0.5, 0.7, 0.9]}, ()),
+]
+DATASETS_BY_NAME = {dataset.name: dataset for dataset in DATASETS}
+
+# Slides read their data with loadSlideData('data/<file>.json') (see
+# index.html). SLIDE_MANIFEST lists the files each slide asks for, with byte
+# sizes, so the front end fetches only the current slide's data and
+# prefetches the next slide's.
+SLIDES_DIR = os.path.join('..', 'slides')
+SLIDE_DATA_CALL = re.compile(r'''loadSlideData\(\s*['"](data/[^'"]+\.json)['"]''')
+SLIDE_MANIFEST = 'slide_data.json'
+
+# Helpers whose source also determines the output bytes of every dataset
+SHARED_SOURCES = [write_if_changed, write_json, json_writer, columnar]
+
+# Sources that determine the statistics of every shared sample
+SAMPLE_SOURCES = [pipeline, moments, quantiles, modes, bootstrap, samplers]
+
+def spawn_seeds(seed=SEED):
+    """Return an independent SeedSequence for every registered generator"""
+    children = np.random.SeedSequence(seed).spawn(len(DATASETS))
+    return {dataset.name: child for dataset, child in zip(DATASETS, children)}
+
+def spawn_sample_seeds(seed=SEED):
+    """Return an independent SeedSequence for every shared sample"""
+    root = np.random.SeedSequence(seed, spawn_key=(SAMPLE_STREAM_KEY,))
+    children = root.spawn(len(SAMPLES))
+    return {spec.name: child for spec, child in zip(SAMPLES, children)}
+
+def resolved_params(dataset, overrides=None):
+    """Return the full keyword arguments a generator will run with"""
+    signature = inspect.signature(dataset.generator)
+    params = {
+        name: parameter.default
+        for name, parameter in signature.parameters.items()
+        if parameter.default is not inspect.Parameter.empty and name not in dataset.samples
+    }
+    params.update(dataset.params)
+    params.update(overrides or {})
+    return params
+
+def local_dependencies(func):
+    """Modules from this directory that a generator refers to by name"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    modules = []
+    for name in func.__code__.co_names:
+        value = func.__globals__.get(name)
+        if inspect.ismodule(value) and os.path.dirname(os.path.abspath(getattr(value, '__file__', ''))) == here:
+            modules.append(value)
+    return modules
+
+def seed_key(seed_seq):
+    """JSON-serializable identity of a SeedSequence"""
+    return [seed_seq.entropy, list(seed_seq.spawn_key)]
+
+def fingerprint(dataset, seed_seq, overrides=None, sample_seeds=None):
+    """Hash of everything that determines a dataset's output bytes"""
+    overrides = overrides or {}
+    h = hashlib.sha256()
+    for func in [dataset.generator] + local_dependencies(dataset.generator) + SHARED_SOURCES:
+        h.update(inspect.getsource(func).encode('utf-8'))
+    h.update(json.dumps(resolved_params(dataset, overrides.get(dataset.name)),
+                        sort_keys=True, default=repr).encode('utf-8'))
+    h.update(json.dumps(seed_key(seed_seq)).encode('utf-8'))
+    if dataset.samples:
+        for module in SAMPLE_SOURCES:
+            h.update(inspect.getsource(module).encode('utf-8'))
+        for name in dataset.samples:
+            spec = SAMPLES_BY_NAME[name]
+            h.update(inspect.getsource(spec.draw).encode('utf-8'))
+            h.update(json.dumps([name, pipeline.resolved_sample_params(spec, overrides.get(name)),
+                                 seed_key(sample_seeds[name])], sort_keys=True).encode('utf-8'))
+    h.update(json.dumps(OUTPUT_OPTIONS, sort_keys=True).encode('utf-8'))
+    h.update(json.dumps({output: SIDECAR_COLUMNS.get(output) for output in dataset.outputs}).encode('utf-8'))
+    return h.hexdigest()
+
+def output_files(dataset):
+    """Every file a dataset writes: its JSON outputs and their sidecars"""
+    files = []
+    for output in dataset.outputs:
+        files.append(output)
+        if output in SIDECAR_COLUMNS:
+            files.extend(columnar.sidecar_files(output, SIDECAR_COLUMNS[output]))
+    return files
+
+def file_digest(path):
+    """SHA-256 of a file's contents"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def load_manifest():
+    """Load the build manifest, or an empty one if there is none yet"""
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    with open(MANIFEST_FILE) as f:
+        return json.load(f)
+
+def is_up_to_date(dataset, key, manifest):
+    """Whether a dataset's recorded fingerprint and outputs are still valid"""
+    entry = manifest.get(dataset.name)
+    if entry is None or entry.get('fingerprint') != key:
+        return False
+    for output in output_files(dataset):
+        if not os.path.exists(output) or file_digest(output) != entry['outputs'].get(output):
+            return False
+    return True
+
+def group_jobs(datasets):
+    """
+    Split datasets into jobs so that datasets sharing a sample run together.
+    
+    Each job is the list of names of one connected group (datasets linked by
+    common samples), in registry order; every sample is then drawn exactly
+    once per build, in the worker that runs its job.
+    """
+    jobs = []
+    for dataset in datasets:
+        linked = [job for job in jobs if job['samples'] & set(dataset.samples)]
+        merged = {'names': [], 'samples': set(dataset.samples)}
+        for job in linked:
+            merged['names'] += job['names']
+            merged['samples'] |= job['samples']
+            jobs.remove(job)
+        merged['names'].append(dataset.name)
+        jobs.append(merged)
+    order = {dataset.name: index for index, dataset in enumerate(datasets)}
+    jobs = [sorted(job['names'], key=order.get) for job in jobs]
+    return sorted(jobs, key=lambda names: order[names[0]])
+
+def run_job(names, seeds, sample_seeds, overrides=None, workers=1):
+    """
+    Run registered generators on their own random streams, drawing every
+    sample they share once and passing the same summary to each of them.
+    workers is the process count for bootstrapping the samples.
+    """
+    overrides = overrides or {}
+    datasets = [DATASETS_BY_NAME[name] for name in names]
+    summaries = {}
+    for dataset in datasets:
+        for sample in dataset.samples:
+            if sample not in summaries:
+                summaries[sample] = pipeline.draw_sample(
+                    SAMPLES_BY_NAME[sample], np.random.default_rng(sample_seeds[sample]),
+                    overrides.get(sample), workers)
+    for dataset in datasets:
+        params = {**dataset.params, **overrides.get(dataset.name, {})}
+        params.update({sample: summaries[sample] for sample in dataset.samples})
+        dataset.generator(np.random.default_rng(seeds[dataset.name]), **params)
+    return names
+
+def slide_manifest(slides_dir=SLIDES_DIR):
+    """Data files of every slide that loads some, with byte sizes, from its loadSlideData() calls"""
+    producers = {f'data/{output}': dataset.name for dataset in DATASETS for output in dataset.outputs}
+    slides = {}
+    for path in sorted(glob.glob(os.path.join(slides_dir, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            requested = dict.fromkeys(SLIDE_DATA_CALL.findall(f.read()))
+        files = [{'file': file, 'bytes': os.path.getsize(os.path.basename(file))}
+                 for file in requested if file in producers and os.path.exists(os.path.basename(file))]
+        if files:
+            slides[f'slides/{os.path.basename(path)}'] = {
+                'datasets': sorted({producers[entry['file']] for entry in files}),
+                'files': files,
+                'bytes': sum(entry['bytes'] for entry in files),
+            }
+    return slides
+
+def parse_dataset_names(value):
+    """argparse type for a comma separated list of dataset names"""
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in DATASETS_BY_NAME]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown dataset(s): {', '.join(unknown)} "
+            f"(choose from {', '.join(DATASETS_BY_NAME)})")
+    return names
+
+def parse_param(value):
+    """
+    argparse type for a parameter override: dataset.key=value for a
+    generator parameter, or sample.key=value for a shared sample
+    """
+    target, sep, raw = value.partition('=')
+    name, dot, key = target.partition('.')
+    if not sep or not dot:
+        raise argparse.ArgumentTypeError(f"expected dataset.parameter=value, got {value!r}")
+    if name in DATASETS_BY_NAME:
+        dataset = DATASETS_BY_NAME[name]
+        known = [key for key in inspect.signature(dataset.generator).parameters
+                 if key not in dataset.samples]
+    elif name in SAMPLES_BY_NAME:
+        known = pipeline.resolved_sample_params(SAMPLES_BY_NAME[name])
+    else:
+        raise argparse.ArgumentTypeError(f"unknown dataset or sample: {name}")
+    if key not in known:
+        raise argparse.ArgumentTypeError(f"{name} has no parameter {key!r}")
+    try:
+        parsed = json.loads(raw)
+    except ValueError:
+        parsed = raw
+    return name, key, parsed
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Generate the probability presentation datasets")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="number of worker processes (default: 1, run in-process)")
+    parser.add_argument('--only', type=parse_dataset_names, default=None,
+                        help="comma separated datasets to build, e.g. quantiles,boxplot")
+    parser.add_argument('--force', action='store_true',
+                        help="rebuild even if the manifest says a dataset is up to date")
+    parser.add_argument('--precision', type=int, default=None,
+                        help="significant digits for floats in the JSON output (default: full precision)")
+    parser.add_argument('--encoding', choices=['json', 'typed'], default='json',
+                        help="'typed' writes large numeric arrays as base64 float32/int32 blobs")
+    parser.add_argument('--param', type=parse_param, action='append', default=[],
+                        metavar='NAME.KEY=VALUE',
+                        help="override a generator or shared sample parameter, "
+                             "e.g. skewed.chunk_size=1000000")
+    parser.add_argument('--bootstrap', type=int, default=0, metavar='N',
+                        help="add bootstrap confidence intervals from N resamples of every "
+                             "shared sample (same as --param SAMPLE.bootstrap=N)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Generate all datasets"""
+    args = parse_args(argv)
     print("Generating probability presentation datasets...")
     
     # Change to data directory
-    os.chdir('/home/ubuntu/probability_presentation/data')
-    
-    # Generate all datasets
-    coin_data = generate_coin_flip_data()
-    print("✓ Generated coin flip data")
-    
-    prob_dist_data = generate_probability_distribution_data()
-    print("✓ Generated probability distribution data")
-    
-    normal_data, skewed_data = generate_central_tendency_data()
-    print("✓ Generated central tendency data")
-    
-    quantiles_data = generate_quantiles_data()
-    print("✓ Generated quantiles data")
-    
-    boxplot_data = generate_boxplot_data()
-    print("✓ Generated boxplot data")
-    
-    dispersion_data = generate_dispersion_data()
-    print("✓ Generated dispersion data")
-    
-    advanced_data = generate_advanced_visualization_data()
-    print("✓ Generated advanced visualization data")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    
+    configure_output(precision=args.precision, encoding=args.encoding)
+    seeds = spawn_seeds()
+    sample_seeds = spawn_sample_seeds()
+    manifest = load_manifest()
+    selected = [dataset for dataset in DATASETS if args.only is None or dataset.name in args.only]
+    
+    # Skip datasets whose inputs have not changed since the last build
+    overrides = {}
+    if args.bootstrap:
+        for spec in SAMPLES:
+            overrides.setdefault(spec.name, {})['bootstrap'] = args.bootstrap
+    for name, key, value in args.param:
+        overrides.setdefault(name, {})[key] = value
+    keys = {dataset.name: fingerprint(dataset, seeds[dataset.name], overrides, sample_seeds)
+            for dataset in selected}
+    pending = []
+    for dataset in selected:
+        if not args.force and is_up_to_date(dataset, keys[dataset.name], manifest):
+            print(f"• Up to date: {dataset.message}")
+        else:
+            pending.append(dataset)
+    
+    def record(name):
+        dataset = DATASETS_BY_NAME[name]
+        manifest[name] = {
+            'fingerprint': keys[name],
+            'outputs': {output: file_digest(output) for output in output_files(dataset)},
+        }
+        print(f"✓ Generated {dataset.message}")
+    
+    # Generate the remaining datasets, those sharing a sample in one job
+    jobs = group_jobs(pending)
+    # Jobs without shared samples share the pool; jobs with samples run here
+    # afterwards and spread their bootstrap over all the workers instead
+    # (a bootstrap pool inside a pooled job would start up to jobs**2 processes)
+    pooled = [names for names in jobs
+              if not any(DATASETS_BY_NAME[name].samples for name in names)]
+    if args.jobs > 1 and len(pooled) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=configure_output,
+                                 initargs=(args.precision, args.encoding)) as pool:
+            futures = [pool.submit(run_job, names, seeds, sample_seeds, overrides)
+                       for names in pooled]
+            for future in futures:
+                for name in future.result():
+                    record(name)
+    else:
+        pooled = []
+    for names in jobs:
+        if names not in pooled:
+            for name in run_job(names, seeds, sample_seeds, overrides, args.jobs):
+                record(name)
+    
+    write_json(MANIFEST_FILE, {name: manifest[name] for name in sorted(manifest)})
+    write_json(SLIDE_MANIFEST, slide_manifest())
     
     print("\nAll datasets generated successfully!")
     print(f"Files created in: {os.getcwd()}")
     
     # List generated files
-    files = [f for f in os.listdir('.') if f.endswith('.json')]
+    files = [output for dataset in selected for output in dataset.outputs]
     print(f"Generated {len(files)} data files:")
     for file in sorted(files):
         print(f"  - {file}")
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Streaming JSON Writer for Probability Presentation Datasets
+Writes NumPy arrays to disk chunk by chunk instead of via .tolist()
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+"""
+
+import base64
+import json
+import numpy as np
+
+# Number of array elements formatted per write. Peak memory is bounded by
+# one chunk of text, no matter how large the array is.
+CHUNK_SIZE = 1 << 16
+
+# Typed-array encoding: numeric arrays with at least TYPED_ARRAY_MIN_SIZE
+# elements are written as {"dtype", "shape", "encoding": "base64", "data"}
+# objects holding little-endian float32/int32 bytes, which the browser can
+# wrap in a Float32Array/Int32Array without parsing any decimal text.
+# Smaller arrays (quartiles, deciles, ...) stay readable JSON lists.
+TYPED_ARRAY_MIN_SIZE = 64
+TYPED_ARRAY_DTYPES = {
+    'f': ('float32', np.dtype('<f4')),
+    'i': ('int32', np.dtype('<i4')),
+    'u': ('int32', np.dtype('<i4')),
+    'b': ('uint8', np.dtype('u1')),
+}
+
+def format_numbers(chunk, precision=None):
+    """
+    Format a 1-D numeric chunk as comma separated JSON numbers.
+
+    precision=None keeps full round-trip precision (the same text json.dump
+    writes); otherwise floats are written with `precision` significant digits.
+    """
+    if chunk.dtype.kind == 'b':
+        return ','.join('true' if v else 'false' for v in chunk.tolist())
+    if chunk.dtype.kind in 'iu':
+        return ','.join(map(str, chunk.tolist()))
+    values = chunk.tolist()
+    if not np.isfinite(chunk).all():
+        # Same spelling json.dump uses for NaN/Infinity
+        return ','.join(json.dumps(v) for v in values)
+    if precision is None:
+        return ','.join(map(float.__repr__, values))
+    fmt = f'.{precision}g'
+    return ','.join(format(v, fmt) for v in values)
+
+def write_array(arr, f, precision=None, chunk_size=CHUNK_SIZE):
+    """Write an ndarray as (nested) JSON lists, streaming the innermost axis"""
+    if arr.ndim == 0:
+        f.write(format_numbers(arr.reshape(1), precision) if arr.dtype.kind in 'biuf'
+                else json.dumps(arr.item()))
+        return
+    if arr.ndim > 1:
+        f.write('[')
+        for i, row in enumerate(arr):
+            if i:
+                f.write(',')
+            write_array(row, f, precision, chunk_size)
+        f.write(']')
+        return
+
+    f.write('[')
+    for start in range(0, len(arr), chunk_size):
+        if start:
+            f.write(',')
+        chunk = arr[start:start + chunk_size]
+        if chunk.dtype.kind in 'biuf':
+            f.write(format_numbers(chunk, precision))
+        else:
+            f.write(','.join(json.dumps(v) for v in chunk.tolist()))
+    f.write(']')
+
+def is_typed_array(arr):
+    """Whether write_typed_array applies to arr"""
+    return arr.dtype.kind in TYPED_ARRAY_DTYPES and arr.ndim >= 1 and arr.size >= TYPED_ARRAY_MIN_SIZE
+
+def write_typed_array(arr, f, chunk_size=CHUNK_SIZE):
+    """Write a numeric ndarray as a base64 typed-array object, in chunks"""
+    name, dtype = TYPED_ARRAY_DTYPES[arr.dtype.kind]
+    if dtype.kind == 'i' and arr.size and arr.dtype.kind in 'iu':
+        info = np.iinfo(dtype)
+        if arr.min() < info.min or arr.max() > info.max:
+            raise ValueError(f"integer column does not fit in {name}")
+    f.write(f'{{"dtype":"{name}","shape":{json.dumps(list(arr.shape))},"encoding":"base64","data":"')
+    flat = arr.reshape(-1)
+    # A multiple of 3 elements keeps every chunk on a base64 group boundary
+    step = max(3, chunk_size - chunk_size % 3)
+    for start in range(0, flat.size, step):
+        chunk = flat[start:start + step].astype(dtype, copy=False)
+        f.write(base64.b64encode(chunk.tobytes()).decode('ascii'))
+    f.write('"}')
+
+def dump(obj, f, precision=None, chunk_size=CHUNK_SIZE, typed_arrays=False):
+    """
+    Serialize obj as compact JSON to the file object f.
+
+    Dicts, lists and scalars are written like json.dump(separators=(',', ':')),
+    while NumPy arrays are streamed in chunks without materializing a Python
+    float for every element. With typed_arrays=True, large numeric arrays
+    are written as base64 typed-array objects instead (see write_typed_array).
+    """
+    if isinstance(obj, np.ndarray):
+        if typed_arrays and is_typed_array(obj):
+            write_typed_array(obj, f, chunk_size)
+        else:
+            write_array(obj, f, precision, chunk_size)
+    elif isinstance(obj, dict):
+        f.write('{')
+        for i, (key, value) in enumerate(obj.items()):
+            if i:
+                f.write(',')
+            f.write(json.dumps(str(key)))
+            f.write(':')
+            dump(value, f, precision, chunk_size, typed_arrays)
+        f.write('}')
+    elif isinstance(obj, (list, tuple)):
+        f.write('[')
+        for i, value in enumerate(obj):
+            if i:
+                f.write(',')
+            dump(value, f, precision, chunk_size, typed_arrays)
+        f.write(']')
+    elif isinstance(obj, np.generic):
+        dump(obj.item(), f, precision, chunk_size, typed_arrays)
+    elif isinstance(obj, float) and precision is not None and np.isfinite(obj):
+        f.write(format(obj, f'.{precision}g'))
+    else:
+        f.write(json.dumps(obj))
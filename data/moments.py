@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Streaming Moments for Probability Presentation Datasets
+Numerically stable, mergeable count/mean/M2/M3/M4 accumulators
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+Each block of samples is reduced to its own central moments with NumPy and
+then merged into the running totals with the pairwise update formulas of
+Chan et al. and Pébay (2008). Merging is exact up to floating point
+rounding, so summaries of billions of draws can be built in bounded
+memory, block by block or in several worker processes whose partial
+results are combined at the end.
+"""
+
+import numpy as np
+
+class RunningMoments:
+    """
+    Mergeable accumulator for the first four moments of a sample.
+
+    >>> m = RunningMoments()
+    >>> for block in blocks:
+    ...     m.update(block)
+    >>> m.mean, m.variance(), m.skewness(), m.kurtosis()
+    """
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, m3=0.0, m4=0.0):
+        self.count = int(count)
+        self.mean = float(mean)
+        self.m2 = float(m2)
+        self.m3 = float(m3)
+        self.m4 = float(m4)
+
+    @classmethod
+    def from_values(cls, values):
+        """Central moments of a single in-memory block"""
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return cls()
+        mean = values.mean()
+        deviations = values - mean
+        squared = deviations * deviations
+        return cls(values.size, mean, squared.sum(),
+                   (squared * deviations).sum(), (squared * squared).sum())
+
+    def update(self, values):
+        """Add a block of samples"""
+        return self.merge(RunningMoments.from_values(values))
+
+    def merge(self, other):
+        """Combine another accumulator into this one (in place)"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean = other.count, other.mean
+            self.m2, self.m3, self.m4 = other.m2, other.m3, other.m4
+            return self
+
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        delta_n = delta / n
+        delta_n2 = delta_n * delta_n
+        term = delta * delta_n * na * nb
+
+        m4 = (self.m4 + other.m4
+              + term * delta_n2 * (na * na - na * nb + nb * nb)
+              + 6.0 * delta_n2 * (na * na * other.m2 + nb * nb * self.m2)
+              + 4.0 * delta_n * (na * other.m3 - nb * self.m3))
+        m3 = (self.m3 + other.m3
+              + term * delta_n * (na - nb)
+              + 3.0 * delta_n * (na * other.m2 - nb * self.m2))
+        m2 = self.m2 + other.m2 + term
+
+        self.count = n
+        self.mean = self.mean + delta_n * nb
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        return self
+
+    @classmethod
+    def combine(cls, parts):
+        """Merge several partial results, e.g. one per worker process"""
+        total = cls()
+        for part in parts:
+            total.merge(part)
+        return total
+
+    def variance(self, ddof=0):
+        """Sample variance (population variance by default, like np.var)"""
+        if self.count - ddof <= 0:
+            return float('nan')
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof=0):
+        """Sample standard deviation (like np.std)"""
+        return float(np.sqrt(self.variance(ddof)))
+
+    def skewness(self):
+        """Biased sample skewness g1, like scipy.stats.skew"""
+        if self.m2 == 0:
+            return float('nan')
+        return float(np.sqrt(self.count) * self.m3 / self.m2 ** 1.5)
+
+    def kurtosis(self):
+        """Excess kurtosis g2, like scipy.stats.kurtosis"""
+        if self.m2 == 0:
+            return float('nan')
+        return float(self.count * self.m4 / (self.m2 * self.m2) - 3.0)
+
+    def to_dict(self):
+        """Raw accumulator state, e.g. to pass between processes as JSON"""
+        return {'count': self.count, 'mean': self.mean,
+                'm2': self.m2, 'm3': self.m3, 'm4': self.m4}
+
+    def __repr__(self):
+        return (f'RunningMoments(count={self.count}, mean={self.mean!r}, '
+                f'variance={self.variance()!r})')
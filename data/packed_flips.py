@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Bit-Packed Coin-Flip Sequences for the Probability Presentation
+64 flips per uint64 word, drawn from raw generator bits, with popcount
+tallies and bit-mask pattern tests
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+A batch of n_sequences sequences of n_flips flips is a C-contiguous
+(n_sequences, ceil(n_flips / 64)) uint64 array. Flip j of a sequence is bit
+j % 64 of word j // 64 (least significant bit first), 1 = heads, and the
+padding bits after the last flip are always zero. One flip costs one bit,
+against a byte for a uint8 matrix and 50+ bytes for a list of 'H'/'T'
+strings, so 10**9 flips take 125 MB.
+
+A fair coin's words are the generator's raw 64-bit outputs
+(BitGenerator.random_raw), with no conversion per flip. Heads are counted
+with a vectorized popcount (np.bitwise_count, or a SWAR fallback on older
+NumPy), and a pattern at any position is tested against a mask/value pair
+of words. save() and load() store the words in an .npz file for replay.
+"""
+
+import numpy as np
+
+import samplers
+
+WORD_BITS = 64
+
+# Sequences per block when packing biased flips
+PACK_BLOCK_FLIPS = 1 << 22
+
+def popcount(words):
+    """Number of set bits in every uint64"""
+    words = np.asarray(words, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words)
+    # SWAR popcount for NumPy < 2.0
+    words = words - ((words >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    words = (words & np.uint64(0x3333333333333333)) + ((words >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    words = (words + (words >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((words * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.uint8)
+
+def n_words(n_flips):
+    """Words holding n_flips flips"""
+    return -(-n_flips // WORD_BITS)
+
+def parse_pattern(pattern):
+    """'HHT' or a sequence of 0/1 -> list of bits (1 = heads)"""
+    if isinstance(pattern, str):
+        if set(pattern) - set('HT'):
+            raise ValueError("patterns are strings of 'H' and 'T'")
+        return [1 if flip == 'H' else 0 for flip in pattern]
+    return [int(bool(flip)) for flip in pattern]
+
+def pattern_masks(pattern, start, total_words):
+    """
+    (first_word, mask, value) of a pattern placed at flip `start`: the
+    pattern matches when words[:, first_word:first_word + len(mask)] & mask
+    equals value.
+    """
+    bits = parse_pattern(pattern)
+    offset = start % WORD_BITS
+    first_word = start // WORD_BITS
+    span = n_words(offset + len(bits))
+    if first_word + span > total_words:
+        raise ValueError("pattern runs past the end of the sequences")
+    mask = ((1 << len(bits)) - 1) << offset
+    value = sum(bit << (offset + i) for i, bit in enumerate(bits))
+    split = lambda number: np.array([(number >> (WORD_BITS * i)) & (2 ** WORD_BITS - 1)
+                                     for i in range(span)], dtype=np.uint64)
+    return first_word, split(mask), split(value)
+
+class PackedFlips:
+    """
+    A batch of coin-flip sequences stored one bit per flip.
+
+    >>> flips = PackedFlips.random(1000, 10**6)
+    >>> flips.tally_heads()              # histogram of heads per sequence
+    >>> flips.matches('HHHHH')           # which sequences start with 5 heads
+    """
+
+    def __init__(self, words, n_flips):
+        words = np.ascontiguousarray(words, dtype=np.uint64)
+        if words.ndim != 2 or words.shape[1] != n_words(n_flips):
+            raise ValueError(f"expected (n_sequences, {n_words(n_flips)}) words for {n_flips} flips")
+        self.words = words
+        self.n_flips = int(n_flips)
+        self._clear_padding()
+
+    def _clear_padding(self):
+        tail = self.n_flips % WORD_BITS
+        if tail and self.words.size:
+            self.words[:, -1] &= np.uint64((1 << tail) - 1)
+
+    @classmethod
+    def random(cls, n_sequences, n_flips, p=0.5, rng=None):
+        """n_sequences random sequences, straight from raw generator bits for a fair coin"""
+        rng = samplers.get_rng(rng)
+        shape = (n_sequences, n_words(n_flips))
+        if p == 0.5:
+            words = rng.bit_generator.random_raw(shape[0] * shape[1]).reshape(shape)
+            return cls(words, n_flips)
+        words = np.empty(shape, dtype=np.uint64)
+        block = max(1, PACK_BLOCK_FLIPS // max(n_flips, 1))
+        for start in range(0, n_sequences, block):
+            stop = min(start + block, n_sequences)
+            words[start:stop] = cls.pack(rng.random((stop - start, n_flips)) < p)
+        return cls(words, n_flips)
+
+    @staticmethod
+    def pack(flips):
+        """(n_sequences, n_flips) 0/1 matrix -> packed words"""
+        flips = np.asarray(flips, dtype=bool)
+        packed = np.packbits(flips, axis=1, bitorder='little')
+        padded = np.zeros((flips.shape[0], n_words(flips.shape[1]) * 8), dtype=np.uint8)
+        padded[:, :packed.shape[1]] = packed
+        return padded.view('<u8').astype(np.uint64, copy=False)
+
+    @classmethod
+    def from_flips(cls, flips):
+        """Pack a (n_sequences, n_flips) 0/1 matrix, 1 = heads"""
+        flips = np.atleast_2d(flips)
+        return cls(cls.pack(flips), flips.shape[1])
+
+    def to_flips(self):
+        """The (n_sequences, n_flips) uint8 matrix, 1 = heads"""
+        as_bytes = self.words.astype('<u8', copy=False).view(np.uint8)
+        return np.unpackbits(as_bytes, axis=1, count=self.n_flips, bitorder='little')
+
+    def __len__(self):
+        return self.words.shape[0]
+
+    def __getitem__(self, rows):
+        return PackedFlips(np.atleast_2d(self.words[rows]), self.n_flips)
+
+    @property
+    def nbytes(self):
+        return self.words.nbytes
+
+    def flip(self, j):
+        """Flip j of every sequence (0/1)"""
+        if not 0 <= j < self.n_flips:
+            raise IndexError("flip index out of range")
+        return ((self.words[:, j // WORD_BITS] >> np.uint64(j % WORD_BITS)) & np.uint64(1)).astype(np.uint8)
+
+    def heads(self, stop=None):
+        """Heads among the first `stop` flips (all by default) of every sequence"""
+        stop = self.n_flips if stop is None else min(int(stop), self.n_flips)
+        full, tail = divmod(stop, WORD_BITS)
+        counts = popcount(self.words[:, :full]).sum(axis=1, dtype=np.int64)
+        if tail:
+            counts += popcount(self.words[:, full] & np.uint64((1 << tail) - 1))
+        return counts
+
+    def running_heads(self, stops):
+        """(n_sequences, len(stops)) heads among the first stops[i] flips"""
+        stops = np.minimum(np.asarray(stops, dtype=np.int64), self.n_flips)
+        per_word = np.cumsum(popcount(self.words), axis=1, dtype=np.int64)
+        before = np.concatenate([np.zeros((len(self), 1), dtype=np.int64), per_word], axis=1)
+        full, tail = np.divmod(stops, WORD_BITS)
+        counts = before[:, full]
+        partial = np.flatnonzero(tail)
+        if partial.size:
+            masks = (np.left_shift(np.uint64(1), tail[partial].astype(np.uint64)) - np.uint64(1))
+            counts[:, partial] += popcount(self.words[:, full[partial]] & masks)
+        return counts
+
+    def tally_heads(self):
+        """Counts of sequences with k = 0..n_flips heads"""
+        return np.bincount(self.heads(), minlength=self.n_flips + 1)
+
+    def matches(self, pattern, start=0):
+        """Whether each sequence shows pattern ('HHT' or 0/1 bits) at flip `start`"""
+        first_word, mask, value = pattern_masks(pattern, start, self.words.shape[1])
+        if start + len(parse_pattern(pattern)) > self.n_flips:
+            raise ValueError("pattern runs past the end of the sequences")
+        window = self.words[:, first_word:first_word + len(mask)]
+        return np.all((window & mask) == value, axis=1)
+
+    def save(self, path):
+        """Store the sequences in an .npz file"""
+        np.savez(path, words=self.words, n_flips=self.n_flips)
+
+    @classmethod
+    def load(cls, path):
+        """Sequences stored by save()"""
+        with np.load(path) as stored:
+            return cls(stored['words'], int(stored['n_flips']))
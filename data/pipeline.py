@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Fused Sampling Pipeline for Probability Presentation Datasets
+Draws each shared sample once and streams it through every registered
+statistic consumer in a single pass
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+Several datasets summarize the same distribution (the skewed central
+tendency, quantiles and dispersion files all use skewnorm(10)). Instead of
+every generator drawing and scanning its own array, a SampleSpec is drawn
+once per build in blocks, and each block is handed to all consumers
+(moments, exported values, quantiles, ...) while it is still hot in cache.
+The datasets then read their statistics from the finished SampleSummary,
+so they are consistent with each other by construction.
+"""
+
+from collections import namedtuple
+import numpy as np
+
+from moments import RunningMoments
+from modes import ModeEstimator
+import bootstrap
+import quantiles
+
+# A named distribution: draw(rng, size, **params) returns `size` samples
+SampleSpec = namedtuple('SampleSpec', ['name', 'draw', 'params'])
+
+# Pipeline settings every sample accepts on top of its distribution params
+SAMPLE_DEFAULTS = {
+    'n_samples': 1000,   # total number of draws
+    'chunk_size': None,  # block size, None = a single in-memory block
+    'n_values': 1000,    # raw draws exported for plotting
+    'sketch_k': 1024,    # quantile sketch capacity once there are several blocks
+    'mode_bins': 16384,  # histogram bins of the mode estimator
+    'bootstrap': 0,      # bootstrap resamples for confidence intervals, 0 = off
+    'confidence': 0.95,  # confidence level of the bootstrap intervals
+}
+
+# Percentiles that get bootstrap intervals: everything the datasets report
+# except the extremes, whose percentile intervals are degenerate
+BOOTSTRAP_PERCENTILES = [1, 5, 10, 20, 25, 30, 40, 50, 60, 70, 75, 80, 90, 95, 99]
+
+def draw_blocks(draw, n_samples, chunk_size=None):
+    """
+    Yield n_samples draws of draw(size) in blocks of at most chunk_size.
+
+    chunk_size=None draws everything in a single block, which consumes the
+    random stream exactly like one draw(size=n_samples) call.
+    """
+    chunk_size = chunk_size or n_samples
+    for start in range(0, n_samples, chunk_size):
+        yield draw(min(chunk_size, n_samples - start))
+
+class ValuesHead:
+    """Consumer keeping the first n_values draws"""
+
+    def __init__(self, n_values):
+        self.n_values = n_values
+        self._parts = []
+        self._count = 0
+
+    def update(self, block):
+        if self._count < self.n_values:
+            head = block[:self.n_values - self._count]
+            self._parts.append(head)
+            self._count += len(head)
+
+    @property
+    def values(self):
+        return np.concatenate(self._parts) if self._parts else np.empty(0)
+
+class QuantileAccumulator:
+    """
+    Consumer for quantiles: exact while the whole sample is a single block,
+    a mergeable QuantileSketch as soon as a second block arrives.
+    """
+
+    def __init__(self, sketch_k=1024, sketch_seed=0):
+        self._block = None
+        self._sketch = None
+        self._sketch_k = sketch_k
+        self._sketch_seed = sketch_seed
+
+    def update(self, block):
+        if self._sketch is None and self._block is None:
+            self._block = block
+            return
+        if self._sketch is None:
+            self._sketch = quantiles.QuantileSketch(self._sketch_k, seed=self._sketch_seed)
+            self._sketch.update(self._block)
+            self._block = None
+        self._sketch.update(block)
+
+    @property
+    def exact(self):
+        return self._sketch is None
+
+    def percentiles(self, ps):
+        if self.exact:
+            return quantiles.percentiles(self._block, ps)
+        return self._sketch.percentiles(ps)
+
+    def info(self):
+        """How the quantiles were computed, for the JSON output"""
+        if self.exact:
+            return {'method': 'exact'}
+        return {'method': 'sketch', 'rank_error_99': self._sketch.rank_error(0.99)}
+
+class SampleSummary:
+    """
+    Fused summary of one sample, fed block by block.
+
+    Every registered consumer (anything with an update(block) method) sees
+    every block exactly once. Moments, the exported values, quantiles and
+    the mode histogram are always registered; further consumers can be
+    added with register().
+    """
+
+    def __init__(self, n_values=1000, sketch_k=1024, sketch_seed=0, mode_bins=16384):
+        self.consumers = {}
+        self.register('moments', RunningMoments())
+        self.register('values', ValuesHead(n_values))
+        self.register('quantiles', QuantileAccumulator(sketch_k, sketch_seed))
+        self.register('mode', ModeEstimator(mode_bins))
+        self.bootstrap = None
+
+    def register(self, name, consumer):
+        """Add a statistic consumer; it only sees blocks added afterwards"""
+        self.consumers[name] = consumer
+        return consumer
+
+    def update(self, block):
+        """Stream one block through every consumer"""
+        for consumer in self.consumers.values():
+            consumer.update(block)
+        return self
+
+    @property
+    def moments(self):
+        return self.consumers['moments']
+
+    @property
+    def values(self):
+        """The exported raw values (the first n_values draws)"""
+        return self.consumers['values'].values
+
+    def percentiles(self, ps):
+        """Percentiles of the whole sample, exact or from the sketch"""
+        return self.consumers['quantiles'].percentiles(ps)
+
+    def quantile_info(self):
+        return self.consumers['quantiles'].info()
+
+    def mode(self):
+        """Mode of the whole sample with its bandwidth and standard error"""
+        return self.consumers['mode'].estimate()
+
+    def run_bootstrap(self, n_resamples, confidence=0.95, seed=None, workers=1):
+        """
+        Bootstrap the mean, mode and BOOTSTRAP_PERCENTILES of the sample kept
+        by the 'sample' consumer (see draw_sample).
+        """
+        replicates = bootstrap.bootstrap(
+            self.consumers['sample'].values, n_resamples,
+            np.array(BOOTSTRAP_PERCENTILES) / 100.0, seed=seed, workers=workers,
+            mode_estimator=self.consumers['mode'])
+        self.bootstrap = {
+            'n_resamples': n_resamples,
+            'confidence': confidence,
+            'mean': bootstrap.percentile_interval(replicates['mean'], confidence),
+            'percentiles': dict(zip(BOOTSTRAP_PERCENTILES,
+                                    bootstrap.percentile_interval(replicates['quantiles'], confidence))),
+        }
+        if 'mode' in replicates:
+            self.bootstrap['mode'] = bootstrap.percentile_interval(replicates['mode'], confidence)
+        return self.bootstrap
+
+    def confidence_intervals(self, ps=()):
+        """
+        Bootstrap intervals of the mean, mode and the percentiles ps, or None
+        when the sample was drawn without a bootstrap.
+        """
+        if self.bootstrap is None:
+            return None
+        intervals = {key: self.bootstrap[key] for key in ('n_resamples', 'confidence', 'mean', 'mode')
+                     if key in self.bootstrap}
+        intervals['percentiles'] = [self.bootstrap['percentiles'][p] for p in ps]
+        return intervals
+
+def resolved_sample_params(spec, overrides=None):
+    """Full parameters of a sample: pipeline defaults, spec params, overrides"""
+    return {**SAMPLE_DEFAULTS, **spec.params, **(overrides or {})}
+
+def draw_sample(spec, rng, overrides=None, workers=1):
+    """
+    Draw a sample spec once, streaming it through a new SampleSummary.
+
+    With a 'bootstrap' resample count the whole sample is also kept in
+    memory and bootstrapped on `workers` processes afterwards.
+    """
+    params = resolved_sample_params(spec, overrides)
+    distribution = {key: value for key, value in params.items() if key not in SAMPLE_DEFAULTS}
+    summary = SampleSummary(params['n_values'], params['sketch_k'], mode_bins=params['mode_bins'])
+    if params['bootstrap']:
+        summary.register('sample', ValuesHead(params['n_samples']))
+    for block in draw_blocks(lambda size: spec.draw(rng, size, **distribution),
+                             params['n_samples'], params['chunk_size']):
+        summary.update(block)
+    if params['bootstrap']:
+        # Seeded from the sample's own stream, after all of its draws
+        seed = np.random.SeedSequence(int(rng.integers(2 ** 63)))
+        summary.run_bootstrap(params['bootstrap'], params['confidence'], seed, workers)
+    return summary
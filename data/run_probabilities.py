@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Exact Run-Length Probabilities for the Probability Presentation
+Longest heads run, expected streak counts and streak-length distributions
+of n flips, without simulation
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+P(longest run >= k) follows the current heads streak as a Markov chain on
+0..k-1 heads, with k as an absorbing "a run of k happened" state. For
+small k the k+1 state transfer matrix is raised to the n-th power by
+repeated squaring, O(k**3 log n). For long runs the probability f(m) that
+the first run of k is complete within m flips obeys
+
+    f(m) = f(m-1) + q * p**k * (1 - f(m-k-1)),
+
+and the next k+1 values depend only on values already known, so they come
+from one cumulative sum: O(n) work in n / (k+1) array operations.
+
+Expected streak counts need no chain at all: a maximal run of exactly k
+heads is k heads bounded by a tail or by the ends of the sequence, so by
+linearity E[runs of length k] = p**k * (2q + (n-k-1) q**2) for k < n.
+"""
+
+import time
+import numpy as np
+
+# Largest run length handled by matrix powers (larger k use the recurrence)
+MATRIX_MAX_RUN = 256
+
+# Longest-run probabilities below this are treated as zero
+TAIL_TOLERANCE = 1e-16
+
+def transfer_matrix(k, p=0.5):
+    """(k+1, k+1) one-flip transitions of the current heads streak, state k absorbing"""
+    matrix = np.zeros((k + 1, k + 1))
+    matrix[np.arange(k), 0] = 1.0 - p
+    matrix[np.arange(k), np.arange(1, k + 1)] = p
+    matrix[k, k] = 1.0
+    return matrix
+
+def first_run_probabilities(n, k, p=0.5):
+    """f[m] = P(a run of at least k heads within the first m flips), m = 0..n"""
+    f = np.zeros(n + 1)
+    if k > n:
+        return f
+    f[k] = p ** k
+    step = (1.0 - p) * p ** k
+    m = k
+    while m < n:
+        stop = min(m + k + 1, n)
+        # f[m+1..stop] only needs f[m-k..stop-k-1], all known already
+        f[m + 1:stop + 1] = f[m] + step * np.cumsum(1.0 - f[m - k:stop - k])
+        m = stop
+    return f
+
+def longest_run_at_least(n, k, p=0.5):
+    """P(the longest run of heads in n flips is at least k)"""
+    n, k = int(n), int(k)
+    if k <= 0:
+        return 1.0
+    if k > n:
+        return 0.0
+    if k <= MATRIX_MAX_RUN:
+        return float(np.linalg.matrix_power(transfer_matrix(k, p), n)[0, k])
+    return float(first_run_probabilities(n, k, p)[n])
+
+def longest_run_distribution(n, p=0.5, tolerance=TAIL_TOLERANCE):
+    """
+    P(longest run = k) for k = 0..K, where every longer run has probability
+    below tolerance (K <= n).
+    """
+    at_least = [1.0]
+    for k in range(1, n + 1):
+        at_least.append(longest_run_at_least(n, k, p))
+        # P(longest >= k) only decreases with k
+        if at_least[-1] < tolerance:
+            break
+    at_least = np.array(at_least + [0.0])
+    return at_least[:-1] - at_least[1:]
+
+def expected_longest_run(n, p=0.5):
+    """E[longest run of heads in n flips]"""
+    distribution = longest_run_distribution(n, p)
+    return float(np.arange(distribution.size) @ distribution)
+
+def expected_runs(n, p=0.5, max_length=None):
+    """
+    E[number of maximal heads runs of length k] in n flips, k = 0..max_length
+    (n by default); with max_length < n the last entry counts runs of length
+    >= max_length, like streaks.streak_statistics().
+    """
+    size = (n if max_length is None else min(int(max_length), n)) + 1
+    q = 1.0 - p
+    k = np.arange(n + 1)
+    runs = p ** k * np.where(k < n, 2 * q + np.maximum(n - k - 1, 0) * q * q, 1.0)
+    runs[0] = 0.0
+    if size <= n:
+        runs[size - 1] = runs[size - 1:].sum()
+    return runs[:size]
+
+def main():
+    """Exact longest-run statistics of 10**6 flips"""
+    n = 10 ** 6
+    start = time.perf_counter()
+    distribution = longest_run_distribution(n)
+    elapsed = time.perf_counter() - start
+    mode = int(np.argmax(distribution))
+    print(f"n = {n:,}: longest-run distribution in {elapsed:.3f} s, "
+          f"mean {np.arange(distribution.size) @ distribution:.3f}, mode {mode}")
+    for k in (15, 20, 25, 30):
+        print(f"  P(longest >= {k}) = {longest_run_at_least(n, k):.6f}")
+    start = time.perf_counter()
+    long_run = longest_run_at_least(n, 200, p=0.95)
+    print(f"  P(longest >= 200 | p = 0.95) = {long_run:.6f} ({time.perf_counter() - start:.3f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Vectorized Samplers for the Probability Presentation
+Fast draws from every distribution the datasets and slides use, built on
+numpy.random.Generator
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+Every sampler takes a batch shape (`size`), an optional preallocated
+`out=` buffer and an optional generator (`rng=`, the module generator set
+by seed() when omitted). Large draws are produced in blocks of BLOCK_SIZE
+values, so the temporary memory of a draw is bounded no matter how big the
+output is:
+
+- skewnorm uses the delta representation
+  X = delta * |U| + sqrt(1 - delta**2) * V with U, V standard normal and
+  delta = a / sqrt(1 + a**2), i.e. two normal draws per value instead of
+  scipy's generic rvs machinery.
+- multivariate_normal factors the covariance with a Cholesky decomposition
+  once and caches it, where Generator.multivariate_normal recomputes an
+  SVD on every call.
+- categorical inverts the cumulative probabilities with one searchsorted
+  over uniform draws; choice() and integers() replace Python loops over
+  random.choice / random.randint.
+
+Run this file to benchmark the samplers against the calls they replace.
+"""
+
+import functools
+import random
+import timeit
+import numpy as np
+
+# Values drawn per block when filling large outputs
+BLOCK_SIZE = 1 << 16
+
+_default_rng = np.random.default_rng()
+
+def seed(value=None):
+    """Reseed the module generator used when no rng is passed"""
+    global _default_rng
+    _default_rng = np.random.default_rng(value)
+    return _default_rng
+
+def get_rng(rng=None):
+    """The given generator, or the module generator"""
+    return _default_rng if rng is None else rng
+
+def _output(size, out, dtype, trailing=()):
+    """The buffer to fill: out (checked against size) or a new array"""
+    if out is None:
+        shape = () if size is None else tuple(np.atleast_1d(size))
+        return np.empty(shape + trailing, dtype=dtype)
+    if not out.flags.c_contiguous:
+        raise ValueError("out must be a C-contiguous array")
+    if size is not None and out.shape != tuple(np.atleast_1d(size)) + trailing:
+        raise ValueError(f"out has shape {out.shape}, expected {tuple(np.atleast_1d(size)) + trailing}")
+    return out
+
+def _result(out, size):
+    """Return a scalar for size=None, like numpy's samplers"""
+    return out[()] if size is None and out.ndim == 0 else out
+
+def _blocks(n, block_size=BLOCK_SIZE):
+    """(start, stop) ranges covering n items in blocks"""
+    for start in range(0, n, block_size):
+        yield start, min(start + block_size, n)
+
+def _fill(out, draw):
+    """Fill out block by block with draw(count)"""
+    flat = out.reshape(-1)
+    for start, stop in _blocks(flat.size):
+        flat[start:stop] = draw(stop - start)
+    return out
+
+def normal(loc=0.0, scale=1.0, size=None, out=None, rng=None):
+    """Normal draws, written straight into the output buffer"""
+    rng = get_rng(rng)
+    out = _output(size, out, float)
+    rng.standard_normal(out=out)
+    out *= scale
+    out += loc
+    return _result(out, size)
+
+def exponential(scale=1.0, size=None, out=None, rng=None):
+    """Exponential draws with the given scale (mean)"""
+    rng = get_rng(rng)
+    out = _output(size, out, float)
+    rng.standard_exponential(out=out)
+    out *= scale
+    return _result(out, size)
+
+def skewnorm(a, loc=0.0, scale=1.0, size=None, out=None, rng=None):
+    """Skew-normal draws with shape a (a=0 is the normal distribution)"""
+    rng = get_rng(rng)
+    out = _output(size, out, float)
+    delta = a / np.sqrt(1.0 + a * a)
+    flat = out.reshape(-1)
+    if delta == 0:
+        rng.standard_normal(out=flat)
+    else:
+        folded = np.empty(min(BLOCK_SIZE, flat.size), dtype=out.dtype)
+        for start, stop in _blocks(flat.size):
+            chunk = flat[start:stop]
+            half = folded[:stop - start]
+            rng.standard_normal(out=chunk)
+            rng.standard_normal(out=half)
+            np.abs(half, out=half)
+            chunk *= np.sqrt(1.0 - delta * delta)
+            half *= delta
+            chunk += half
+    out *= scale
+    out += loc
+    return _result(out, size)
+
+@functools.lru_cache(maxsize=32)
+def _cached_cholesky(cov_bytes, n_dims):
+    cov = np.frombuffer(cov_bytes).reshape(n_dims, n_dims)
+    factor = np.linalg.cholesky(cov)
+    factor.flags.writeable = False
+    return factor
+
+def cholesky_factor(cov):
+    """Lower Cholesky factor of a covariance matrix, cached by its values"""
+    cov = np.ascontiguousarray(cov, dtype=float)
+    if cov.ndim != 2 or cov.shape[0] != cov.shape[1]:
+        raise ValueError("cov must be a square matrix")
+    return _cached_cholesky(cov.tobytes(), cov.shape[0])
+
+def multivariate_normal(mean, cov, size=None, out=None, rng=None):
+    """
+    Correlated normal draws of shape size + (n_dims,).
+
+    cov must be positive definite; its Cholesky factor is computed once and
+    reused by every later call with the same matrix.
+    """
+    rng = get_rng(rng)
+    mean = np.asarray(mean, dtype=float)
+    factor = cholesky_factor(cov)
+    n_dims = factor.shape[0]
+    out = _output(size, out, float, trailing=(n_dims,))
+    rows = out.reshape(-1, n_dims)
+    normals = np.empty((min(max(BLOCK_SIZE // n_dims, 1), len(rows)), n_dims))
+    for start, stop in _blocks(len(rows), len(normals) or 1):
+        z = normals[:stop - start]
+        rng.standard_normal(out=z)
+        np.matmul(z, factor.T, out=rows[start:stop])
+    out += mean
+    return out
+
+def binomial(n, p, size=None, out=None, rng=None):
+    """Binomial draws; n and p may be arrays that broadcast to size"""
+    rng = get_rng(rng)
+    if out is None:
+        return rng.binomial(n, p, size)
+    out = _output(size, out, out.dtype)
+    if np.ndim(n) or np.ndim(p):
+        np.copyto(out, rng.binomial(n, p, out.shape), casting='unsafe')
+        return out
+    return _fill(out, lambda count: rng.binomial(n, p, count))
+
+def integers(low, high, size=None, out=None, endpoint=False, rng=None):
+    """Uniform integers in [low, high), or [low, high] with endpoint=True"""
+    rng = get_rng(rng)
+    if out is None:
+        return rng.integers(low, high, size, endpoint=endpoint)
+    out = _output(size, out, out.dtype)
+    return _fill(out, lambda count: rng.integers(low, high, count, dtype=out.dtype, endpoint=endpoint))
+
+def categorical(p, size=None, out=None, rng=None):
+    """Category indices drawn with probabilities p (normalized if needed)"""
+    rng = get_rng(rng)
+    cdf = np.cumsum(p, dtype=float)
+    cdf /= cdf[-1]
+    out = _output(size, out, np.intp)
+    # The last category takes everything above cdf[-2], so rounding in the
+    # cumulative sum can never produce an index past the end
+    inner = cdf[:-1]
+    _fill(out, lambda count: np.searchsorted(inner, rng.random(count), side='right'))
+    return _result(out, size)
+
+def choice(options, size=None, p=None, rng=None):
+    """Draw elements of options, uniformly or with probabilities p"""
+    options = np.asarray(options)
+    if p is None:
+        index = integers(0, len(options), size, rng=rng)
+    else:
+        index = categorical(p, size, rng=rng)
+    return options[index]
+
+def _best_time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+def benchmark(n=1_000_000, repeat=3):
+    """Time each sampler against the call it replaces; returns a list of rows"""
+    from scipy import stats
+    rng = np.random.default_rng(0)
+    cov = [[1.0, 0.5], [0.5, 1.0]]
+    cases = [
+        ('skewnorm(10)',
+         lambda: stats.skewnorm.rvs(10, size=n, random_state=rng),
+         lambda: skewnorm(10, size=n, rng=rng)),
+        ('multivariate_normal, 1000 x 500 points',
+         lambda: [rng.multivariate_normal([0, 0], cov, 500) for _ in range(1000)],
+         lambda: [multivariate_normal([0, 0], cov, 500, rng=rng) for _ in range(1000)]),
+        ('multivariate_normal, 1 x n points',
+         lambda: rng.multivariate_normal([0, 0], cov, n),
+         lambda: multivariate_normal([0, 0], cov, n, rng=rng)),
+        ('binomial(5, 0.5)',
+         lambda: rng.binomial(5, 0.5, n),
+         lambda: binomial(5, 0.5, n, rng=rng)),
+        ('categorical, 3 categories',
+         lambda: rng.choice(3, n, p=[0.4, 0.35, 0.25]),
+         lambda: categorical([0.4, 0.35, 0.25], n, rng=rng)),
+        ('dice, random.randint loop',
+         lambda: [random.randint(1, 6) for _ in range(n)],
+         lambda: integers(1, 6, n, endpoint=True, rng=rng)),
+        ('coin labels, random.choice loop',
+         lambda: [random.choice(['H', 'T']) for _ in range(n)],
+         lambda: choice(['H', 'T'], n, rng=rng)),
+    ]
+    rows = []
+    for name, current, vectorized in cases:
+        before = _best_time(current, repeat)
+        after = _best_time(vectorized, repeat)
+        rows.append((name, before, after, before / after))
+    return rows
+
+def main():
+    """Print the benchmark table"""
+    print(f"{'sampler':40s} | {'current':>10s} | {'samplers':>10s} | speedup")
+    print("-" * 78)
+    for name, before, after, speedup in benchmark():
+        print(f"{name:40s} | {before * 1e3:8.1f}ms | {after * 1e3:8.1f}ms | {speedup:6.1f}x")
+
+if __name__ == "__main__":
+    main()
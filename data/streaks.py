@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Run-Length Streak Analysis for the Probability Presentation
+Heads streaks of many coin-flip sequences at once, from array diff/where
+operations
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+Sequences come as a (n_sequences, n_flips) 0/1 array or as PackedFlips and
+are processed in blocks of about BLOCK_FLIPS flips. Each block is flattened
+with a separating tail before every row and after the last one, so the
+positions where the value changes (flatnonzero of flat[1:] != flat[:-1])
+alternate between streak starts and streak ends: every streak in row-major
+order, including streaks that run to the end of a sequence, with no Python
+loop over flips.
+
+The flip "after a streak of k" is the flip at every position preceded by at
+least k heads in a row (overlapping, as in the gambler's-fallacy question).
+A maximal streak of length m is followed by m - k heads at those positions
+and, unless it ends the sequence, by one tail, so both tallies follow from
+the histograms of streak lengths with reverse cumulative sums and no
+per-position work.
+"""
+
+import time
+import numpy as np
+
+from packed_flips import PackedFlips
+
+# Flips per processed block
+BLOCK_FLIPS = 1 << 20
+
+def iter_blocks(sequences, block_flips=BLOCK_FLIPS):
+    """(first_row, uint8 block) pairs covering a flip matrix or PackedFlips"""
+    if isinstance(sequences, PackedFlips):
+        n_sequences, n_flips = len(sequences), sequences.n_flips
+    else:
+        sequences = np.asarray(sequences)
+        if sequences.ndim == 1:
+            sequences = sequences[np.newaxis, :]
+        n_sequences, n_flips = sequences.shape
+    rows = max(1, block_flips // max(n_flips, 1))
+    for start in range(0, n_sequences, rows):
+        block = sequences[start:start + rows]
+        block = block.to_flips() if isinstance(block, PackedFlips) else block.astype(np.uint8, copy=False)
+        yield start, block
+
+def run_bounds(block):
+    """
+    Maximal heads streaks of a 0/1 block as (offsets, flat_starts, lengths):
+    the streaks of row r are offsets[r]:offsets[r + 1], and flat_starts index
+    the block flattened with one separating tail before every row.
+    """
+    n_rows, n_flips = block.shape
+    padded = np.zeros((n_rows, n_flips + 1), dtype=np.uint8)
+    padded[:, 1:] = block
+    flat = np.append(padded.ravel(), np.uint8(0))
+    # Streaks start and end alternately at every change of value
+    bounds = np.flatnonzero(flat[1:] != flat[:-1])
+    starts, lengths = bounds[::2], bounds[1::2] - bounds[::2]
+    offsets = np.searchsorted(starts, np.arange(n_rows + 1) * (n_flips + 1))
+    return offsets, starts, lengths
+
+def heads_runs(block):
+    """
+    Maximal heads streaks of a 0/1 block: (rows, starts, lengths), sorted by
+    row and then by start.
+    """
+    n_rows, n_flips = block.shape
+    offsets, starts, lengths = run_bounds(block)
+    rows = np.repeat(np.arange(n_rows), np.diff(offsets))
+    return rows, starts - rows * (n_flips + 1), lengths
+
+def streak_statistics(sequences, max_length=None, block_flips=BLOCK_FLIPS):
+    """
+    Streak statistics of a batch of sequences, as a dict:
+
+    lengths      lengths[m] = number of maximal heads streaks of length m
+    open_ended   the same, for streaks that run to the end of their sequence
+    longest      longest streak of every sequence
+    heads_after  heads_after[k] = heads at positions preceded by >= k heads
+    tails_after  tails_after[k] = tails at those positions
+
+    max_length bounds the histograms (longer streaks count at max_length);
+    by default it is the sequence length.
+    """
+    if isinstance(sequences, PackedFlips):
+        n_sequences, n_flips = len(sequences), sequences.n_flips
+    else:
+        n_sequences, n_flips = np.atleast_2d(sequences).shape
+    size = (n_flips if max_length is None else int(max_length)) + 1
+    lengths = np.zeros(size, dtype=np.int64)
+    open_ended = np.zeros(size, dtype=np.int64)
+    # Total (unclipped) length of the streaks in every bucket
+    length_total = np.zeros(size, dtype=np.int64)
+    longest = np.zeros(n_sequences, dtype=np.int64)
+
+    for first_row, block in iter_blocks(sequences, block_flips):
+        offsets, _, run_lengths = run_bounds(block)
+        if not run_lengths.size:
+            continue
+        clipped = np.minimum(run_lengths, size - 1)
+        lengths += np.bincount(clipped, minlength=size)
+        length_total += np.bincount(clipped, weights=run_lengths, minlength=size).astype(np.int64)
+        # A row ending in heads ends with its last streak
+        last = offsets[1:][block[:, -1] == 1] - 1
+        open_ended += np.bincount(clipped[last], minlength=size)
+        # Each row's streaks are one contiguous segment
+        rows = np.flatnonzero(offsets[1:] > offsets[:-1])
+        longest[first_row + rows] = np.maximum.reduceat(run_lengths, offsets[rows])
+
+    # Streaks of length m >= k contribute m - k heads and (if closed) one tail
+    k = np.arange(size)
+    at_least = np.cumsum(lengths[::-1])[::-1]
+    length_sum = np.cumsum(length_total[::-1])[::-1]
+    heads_after = length_sum - k * at_least
+    tails_after = at_least - np.cumsum(open_ended[::-1])[::-1]
+    # Every flip is preceded by at least 0 heads
+    heads_after[0] = length_total.sum()
+    tails_after[0] = n_sequences * n_flips - heads_after[0]
+    return {
+        'lengths': lengths,
+        'open_ended': open_ended,
+        'longest': longest,
+        'heads_after': heads_after,
+        'tails_after': tails_after,
+    }
+
+def streak_runs(sequences, block_flips=BLOCK_FLIPS):
+    """
+    Every maximal heads streak, as arrays: sequence, start, length and
+    next_flip (0 after a tail, -1 when the streak ends the sequence).
+    """
+    parts = [(np.empty(0, dtype=np.intp),) * 4]
+    for first_row, block in iter_blocks(sequences, block_flips):
+        rows, starts, run_lengths = heads_runs(block)
+        next_flip = np.where(starts + run_lengths < block.shape[1], 0, -1)
+        parts.append((first_row + rows, starts, run_lengths, next_flip))
+    columns = [np.concatenate(column) for column in zip(*parts)]
+    return dict(zip(['sequence', 'start', 'length', 'next_flip'], columns))
+
+def main():
+    """Time the streak statistics of 10**6 sequences of 10**3 flips"""
+    rng = np.random.default_rng(42)
+    flips = PackedFlips.random(10 ** 6, 10 ** 3, rng=rng)
+    start = time.perf_counter()
+    stats = streak_statistics(flips, max_length=32)
+    elapsed = time.perf_counter() - start
+    print(f"10^6 x 10^3 flips: {elapsed:.2f} s, {stats['lengths'].sum():,} streaks, "
+          f"mean longest {stats['longest'].mean():.2f}")
+    for k in (1, 2, 5):
+        total = stats['heads_after'][k] + stats['tails_after'][k]
+        print(f"  P(H | {k} heads before) = {stats['heads_after'][k] / total:.4f} ({total:,} flips)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Level-of-Detail Tiles for Probability Presentation Datasets
+Multi-resolution grid counts, per-category counts and stratified
+subsamples of large scatter plots
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+Points are binned once, on the finest grid, with a single bincount over
+(category, cell); every coarser level is the previous one summed over 2 x 2
+blocks, so the whole pyramid costs O(n_points + cells). Each level also
+carries a stratified subsample: points are ranked by a random priority
+within their cell and every cell contributes up to the same number of
+points, the largest number that keeps the level within its point budget.
+Sparse and dense regions are therefore both represented, and the size of
+every level is bounded by its number of cells and its budget, not by
+n_points.
+"""
+
+import numpy as np
+
+def grid_cells(x, y, bounds, size):
+    """Row-major cell index (iy * size + ix) of every point on a size x size grid"""
+    (x_min, x_max), (y_min, y_max) = bounds
+    ix = np.floor((x - x_min) / ((x_max - x_min) or 1.0) * size).astype(np.intp)
+    iy = np.floor((y - y_min) / ((y_max - y_min) or 1.0) * size).astype(np.intp)
+    np.clip(ix, 0, size - 1, out=ix)
+    np.clip(iy, 0, size - 1, out=iy)
+    return iy * size + ix
+
+def count_pyramid(cells, codes, n_categories, finest_size, n_levels):
+    """
+    Per-category counts for n_levels grids, coarsest first.
+
+    cells are indices on the finest grid. Returns a list of arrays of shape
+    (n_categories, size, size) with size = finest_size / 2**(n_levels-1-k).
+    """
+    counts = np.bincount(codes * finest_size * finest_size + cells,
+                         minlength=n_categories * finest_size * finest_size)
+    counts = counts.reshape(n_categories, finest_size, finest_size)
+    levels = [counts]
+    for _ in range(n_levels - 1):
+        size = counts.shape[1] // 2
+        counts = counts.reshape(n_categories, size, 2, size, 2).sum(axis=(2, 4))
+        levels.append(counts)
+    return levels[::-1]
+
+def cap_per_cell(cell_counts, budget):
+    """Largest k such that taking min(count, k) points per cell fits the budget"""
+    low, high = 0, int(cell_counts.max(initial=0))
+    while low < high:
+        k = (low + high + 1) // 2
+        if np.minimum(cell_counts, k).sum() <= budget:
+            low = k
+        else:
+            high = k - 1
+    return low
+
+def stratified_sample(cells, by_priority, budget):
+    """
+    Indices of a stratified subsample of at most budget points.
+
+    by_priority is a random permutation of the points (the order in which
+    they are taken within each cell). When there are more occupied cells
+    than the budget, a random subset of cells contributes one point each.
+    """
+    order = by_priority[np.argsort(cells[by_priority], kind='stable')]
+    sorted_cells = cells[order]
+    starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    cell_counts = np.diff(np.r_[starts, len(order)])
+    rank = np.arange(len(order)) - np.repeat(starts, cell_counts)
+
+    k = cap_per_cell(cell_counts, budget)
+    if k:
+        return order[rank < k]
+    # One point from each of `budget` cells; the first point of each cell is
+    # uniformly random, so ranking them by priority picks random cells
+    firsts = order[starts]
+    position = np.empty(len(by_priority), dtype=np.intp)
+    position[by_priority] = np.arange(len(by_priority))
+    return firsts[np.argsort(position[firsts], kind='stable')[:budget]]
+
+def lod_pyramid(x, y, codes, categories, rng, finest_size=256, n_levels=6, sample_size=2000):
+    """
+    Level-of-detail pyramid of a categorical scatter plot, coarsest first.
+
+    codes are category codes into categories. Each level is a dict with the
+    grid size, the sparse occupied cells (row-major indices, total counts
+    and per-category counts) and a stratified subsample of the points.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    codes = np.asarray(codes, dtype=np.intp)
+    if finest_size % 2 ** (n_levels - 1):
+        raise ValueError("finest_size must be divisible by 2**(n_levels - 1)")
+    bounds = [(float(x.min()), float(x.max())), (float(y.min()), float(y.max()))]
+    finest_cells = grid_cells(x, y, bounds, finest_size)
+    pyramid = count_pyramid(finest_cells, codes, len(categories), finest_size, n_levels)
+    by_priority = rng.permutation(len(x))
+
+    levels = []
+    for level, category_counts in enumerate(pyramid):
+        size = category_counts.shape[1]
+        flat = category_counts.reshape(len(categories), -1)
+        totals = flat.sum(axis=0)
+        occupied = np.flatnonzero(totals)
+        # Finest cell index -> this level's cell index
+        shift = finest_size // size
+        cells = (finest_cells // finest_size // shift) * size + (finest_cells % finest_size) // shift
+        sample = np.sort(stratified_sample(cells, by_priority, sample_size))
+        levels.append({
+            'level': level,
+            'grid_size': size,
+            'bounds': {'x': list(bounds[0]), 'y': list(bounds[1])},
+            'n_points': len(x),
+            'categories': list(categories),
+            'cells': occupied.astype(np.int32),
+            'counts': totals[occupied],
+            'category_counts': flat[:, occupied].T,
+            'sample': {
+                'x': x[sample],
+                'y': y[sample],
+                'category': codes[sample].astype(np.int8),
+            },
+        })
+    return levels
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Data Modules for the Slide Scripts
+Makes the shared modules in data/ (samplers, coins, streaks, ...) importable
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+The slides run as `python slides/slideN.py`, so only slides/ is on
+sys.path. Importing this module first adds data/ as well:
+
+    import data_modules  # puts data/ on sys.path
+    import samplers
+"""
+
+import os
+import sys
+
+# The data generators and the modules they share with the slides
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+if DATA_DIR not in sys.path:
+    sys.path.insert(0, DATA_DIR)
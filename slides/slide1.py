@@ -7,10 +7,11 @@ Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
 כל הזכויות שמורות לד"ר יורם סגל
 """
 
-import random
 import numpy as np
 import matplotlib.pyplot as plt
 from collections import Counter
+import data_modules  # puts data/ on sys.path
+import samplers
 
 def basic_probability_demo():
     """
@@ -22,12 +23,9 @@ def basic_probability_demo():
     
     # הטלת מטבע - Coin flip
     print("\n1. הטלת מטבע (Coin Flip):")
-    coin_results = []
-    for i in range(1000):
-        result = random.choice(['ראש', 'עץ'])  # Heads, Tails
-        coin_results.append(result)
+    coin_results = samplers.choice(['ראש', 'עץ'], 1000)  # Heads, Tails
     
-    heads_count = coin_results.count('ראש')
+    heads_count = int(np.count_nonzero(coin_results == 'ראש'))
     probability_heads = heads_count / 1000
     
     print(f"מספר 'ראש' ב-1000 הטלות: {heads_count}")
@@ -37,11 +35,12 @@ def basic_probability_demo():
     
     # הטלת קובייה - Dice roll
     print("\n2. הטלת קובייה (Dice Roll):")
-    dice_results = [random.randint(1, 6) for _ in range(1000)]
+    dice_results = samplers.integers(1, 6, 1000, endpoint=True)
+    dice_counts = np.bincount(dice_results, minlength=7)
     
     print("תוצאות הטלת קובייה:")
     for number in range(1, 7):
-        count = dice_results.count(number)
+        count = dice_counts[number]
         probability = count / 1000
         theoretical = 1/6
         print(f"מספר {number}: {count:3d} פעמים, הסתברות: {probability:.3f}, תיאורטי: {theoretical:.3f}")
@@ -107,8 +106,8 @@ def theoretical_vs_experimental():
     
     for n in sample_sizes:
         # הטלת מטבע n פעמים
-        results = [random.choice([0, 1]) for _ in range(n)]  # 0=עץ, 1=ראש
-        experimental_prob = sum(results) / n
+        results = samplers.integers(0, 2, n)  # 0=עץ, 1=ראש
+        experimental_prob = results.sum() / n
         difference = abs(experimental_prob - 0.5)
         
         print(f"{n:8d} | {experimental_prob:15.3f} | {difference:13.3f}")
@@ -142,8 +141,7 @@ def main():
 
 if __name__ == "__main__":
     # הגדרת זרע אקראי לשחזור תוצאות
-    random.seed(42)
-    np.random.seed(42)
+    samplers.seed(42)
     
     main()
 
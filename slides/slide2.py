@@ -7,7 +7,6 @@ Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
 כל הזכויות שמורות לד"ר יורם סגל
 """
 
-import random
 from fractions import Fraction
 import matplotlib.pyplot as plt
 import numpy as np
@@ -231,9 +230,5 @@ def main():
     print("\nסיום שקף 2")
 
 if __name__ == "__main__":
-    # הגדרת זרע אקראי לשחזור תוצאות
-    random.seed(42)
-    np.random.seed(42)
-    
     main()
 
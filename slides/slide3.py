@@ -8,12 +8,14 @@ Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
 """
 
 import itertools
-import random
 import numpy as np
 import matplotlib.pyplot as plt
 from fractions import Fraction
-from collections import Counter
 import math
+import data_modules  # puts data/ on sys.path
+import samplers
+import coins
+import run_probabilities
 
 def multiple_coin_flips(n):
     """
@@ -75,6 +77,15 @@ def consecutive_heads_probability():
     print(f"מה הסיכוי לקבל 5 ראשים רצופים?")
     print(f"P(HHHHH) = (1/2)^5 = {(1/2)**5:.5f} = {Fraction(1, 32)}")
     print(f"כלומר, בממוצע זה יקרה פעם אחת מכל {2**5} ניסויים")
+    
+    # רצף של 5 ראשים איפשהו בתוך סדרה ארוכה - חישוב מדויק, בלי סימולציה
+    print(f"\nומה הסיכוי לרצף של לפחות 5 ראשים איפשהו בתוך n הטלות?")
+    print(" n         | P(רצף ≥ 5) | הרצף הארוך הצפוי")
+    print("-" * 45)
+    for n in [5, 10, 100, 1000, 10**6]:
+        prob = run_probabilities.longest_run_at_least(n, 5)
+        longest = run_probabilities.expected_longest_run(n)
+        print(f" {n:<9,} | {prob:10.6f} | {longest:8.3f}")
 
 def binomial_probability(n, k, p=0.5):
     """
@@ -122,21 +133,14 @@ def simulate_multiple_experiments(n_coins, n_experiments=1000):
     """
     print(f"\n=== סימולציה: {n_experiments} ניסויים של {n_coins} הטלות ===")
     
-    results = []
-    for _ in range(n_experiments):
-        # הטלת n_coins מטבעות
-        flips = [random.choice(['H', 'T']) for _ in range(n_coins)]
-        heads_count = flips.count('H')
-        results.append(heads_count)
-    
-    # ספירת התוצאות
-    result_counts = Counter(results)
+    # ספירת מספר הראשים בכל ניסוי, בגושים וקטוריים
+    result_counts = coins.tally_heads(n_experiments, n_coins)
     
     print("מספר ראשים | תדירות | הסתברות ניסיונית | הסתברות תיאורטית")
     print("-" * 70)
     
     for k in range(n_coins + 1):
-        observed_count = result_counts.get(k, 0)
+        observed_count = result_counts[k]
         observed_prob = observed_count / n_experiments
         
         # חישוב הסתברות תיאורטית
@@ -144,7 +148,7 @@ def simulate_multiple_experiments(n_coins, n_experiments=1000):
         
         print(f"{k:11d} | {observed_count:8d} | {observed_prob:17.3f} | {theoretical_prob:18.3f}")
     
-    return results
+    return result_counts
 
 def visualize_multiple_observations():
     """
@@ -160,12 +164,11 @@ def visualize_multiple_observations():
     n_experiments = 1000
     
     # סימולציה
-    simulated_results = simulate_multiple_experiments(n_coins, n_experiments)
-    result_counts = Counter(simulated_results)
+    result_counts = simulate_multiple_experiments(n_coins, n_experiments)
     
     # נתונים לגרף
     k_values = list(range(n_coins + 1))
-    observed_probs = [result_counts.get(k, 0) / n_experiments for k in k_values]
+    observed_probs = [result_counts[k] / n_experiments for k in k_values]
     theoretical_probs = [binomial_probability(n_coins, k)[1] for k in k_values]
     
     x = np.arange(len(k_values))
@@ -213,12 +216,9 @@ def visualize_multiple_observations():
     
     # 4. התכנסות לחוק המספרים הגדולים
     sample_sizes = [10, 50, 100, 500, 1000, 5000]
-    proportions = []
     
-    for size in sample_sizes:
-        flips = [random.choice([0, 1]) for _ in range(size)]  # 0=T, 1=H
-        proportion = sum(flips) / size
-        proportions.append(proportion)
+    # ניסוי עצמאי לכל גודל מדגם
+    proportions = samplers.binomial(sample_sizes, 0.5) / np.array(sample_sizes)
     
     ax4.plot(sample_sizes, proportions, 'o-', color='#0047AB', linewidth=2, markersize=8)
     ax4.axhline(y=0.5, color='red', linestyle='--', linewidth=2, label='הסתברות תיאורטית (0.5)')
@@ -304,8 +304,7 @@ def main():
 
 if __name__ == "__main__":
     # הגדרת זרע אקראי לשחזור תוצאות
-    random.seed(42)
-    np.random.seed(42)
+    samplers.seed(42)
     
     main()
 
@@ -7,12 +7,14 @@ Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
 כל הזכויות שמורות לד"ר יורם סגל
 """
 
-import random
 import numpy as np
 import matplotlib.pyplot as plt
 from fractions import Fraction
 import itertools
 from collections import Counter
+import data_modules  # puts data/ on sys.path
+import samplers
+import coins
 
 def multiplication_rule():
     """
@@ -178,12 +180,8 @@ def simulate_combinations():
     # סימולציה 1: רצף של 5 ראשים
     print(f"1. סימולציה: רצף של 5 ראשים ב-{n_experiments:,} ניסויים")
     
-    successes = 0
-    for _ in range(n_experiments):
-        # הטלת 5 מטבעות
-        flips = [random.choice(['H', 'T']) for _ in range(5)]
-        if all(flip == 'H' for flip in flips):
-            successes += 1
+    # ספירת כל 32 הרצפים של 5 הטלות; HHHHH הוא הרצף האחרון (0b11111)
+    successes = int(coins.tally_sequences(n_experiments, 5)[-1])
     
     observed_prob = successes / n_experiments
     theoretical_prob = (0.5) ** 5
@@ -200,11 +198,9 @@ def simulate_combinations():
     ranks = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
     deck = [(rank, suit) for suit in suits for rank in ranks]
     
-    ace_or_spade_count = 0
-    for _ in range(n_experiments):
-        card = random.choice(deck)
-        if card[0] == 'A' or card[1] == '♠':
-            ace_or_spade_count += 1
+    cards = samplers.integers(0, len(deck), n_experiments)
+    ace_or_spade = np.array([rank == 'A' or suit == '♠' for rank, suit in deck])
+    ace_or_spade_count = int(ace_or_spade[cards].sum())
     
     observed_prob_cards = ace_or_spade_count / n_experiments
     theoretical_prob_cards = 16/52  # 4 אסים + 13 עלים - 1 אס עלים
@@ -244,11 +240,8 @@ def visualize_combinations():
     experimental_results = []
     
     for n in n_trials:
-        successes = 0
-        for _ in range(n):
-            flips = [random.choice([0, 1]) for _ in range(5)]
-            if all(flip == 1 for flip in flips):
-                successes += 1
+        flips = samplers.integers(0, 2, (n, 5))
+        successes = np.all(flips == 1, axis=1).sum()
         experimental_results.append(successes / n)
     
     ax2.plot(n_trials, experimental_results, 'o-', label='ניסיוני', color='#3B82F6', linewidth=2, markersize=8)
@@ -336,8 +329,7 @@ def main():
 
 if __name__ == "__main__":
     # הגדרת זרע אקראי לשחזור תוצאות
-    random.seed(42)
-    np.random.seed(42)
+    samplers.seed(42)
     
     main()
 
@@ -8,12 +8,13 @@ Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
 """
 
 import math
-import random
 import numpy as np
 import matplotlib.pyplot as plt
 from math import factorial
 import itertools
-from collections import Counter
+import data_modules  # puts data/ on sys.path
+import samplers
+import coins
 
 def factorial_examples():
     """
@@ -241,13 +242,7 @@ def simulate_combinatorics():
     print(f"סימולציה: {n_experiments:,} ניסויים של {n_flips} הטלות")
     
     # ספירת תוצאות
-    results = []
-    for _ in range(n_experiments):
-        flips = [random.choice([0, 1]) for _ in range(n_flips)]  # 0=T, 1=H
-        heads_count = sum(flips)
-        results.append(heads_count)
-    
-    result_counts = Counter(results)
+    result_counts = coins.tally_heads(n_experiments, n_flips)
     
     print(f"\nהשוואה: תיאורטי מול ניסיוני")
     print("k | תיאורטי | ניסיוני | הפרש")
@@ -255,7 +250,7 @@ def simulate_combinatorics():
     
     for k in range(n_flips + 1):
         theoretical = combinations_formula(n_flips, k) / (2**n_flips)
-        observed_count = result_counts.get(k, 0)
+        observed_count = result_counts[k]
         experimental = observed_count / n_experiments
         difference = abs(theoretical - experimental)
         
@@ -338,13 +333,8 @@ def visualize_combinatorics():
     
     # ניסיוני (סימולציה)
     n_sim = 10000
-    sim_results = []
-    for _ in range(n_sim):
-        flips = [random.choice([0, 1]) for _ in range(n_flips)]
-        sim_results.append(sum(flips))
-    
-    sim_counts = Counter(sim_results)
-    experimental_probs = [sim_counts.get(k, 0) / n_sim for k in k_vals]
+    sim_counts = coins.tally_heads(n_sim, n_flips)
+    experimental_probs = [sim_counts[k] / n_sim for k in k_vals]
     
     x = np.arange(len(k_vals))
     width = 0.35
@@ -414,8 +404,7 @@ def main():
 
 if __name__ == "__main__":
     # הגדרת זרע אקראי לשחזור תוצאות
-    random.seed(42)
-    np.random.seed(42)
+    samplers.seed(42)
     
     main()
 
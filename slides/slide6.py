@@ -9,8 +9,12 @@ Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
 
 import numpy as np
 import matplotlib.pyplot as plt
-import random
-from collections import Counter
+import data_modules  # puts data/ on sys.path
+import samplers
+import conditional
+import streaks
+import run_probabilities
+from packed_flips import PackedFlips
 
 def law_of_large_numbers_demo():
     """
@@ -21,12 +25,12 @@ def law_of_large_numbers_demo():
     
     # יצירת וקטור של מספרי הטלות גדלים אקספוננציאלית
     ns = np.array([2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096])
-    np.random.seed(42)  # לשחזור תוצאות
+    samplers.seed(42)  # לשחזור תוצאות
     
     print(f"מספרי הטלות בניסוי: {ns}")
     
     # ביצוע ניסויים עם binomial distribution
-    heads_count = [np.random.binomial(n, 0.5) for n in ns]
+    heads_count = samplers.binomial(ns, 0.5)
     proportion_heads = np.array(heads_count) / ns
     
     print(f"\nתוצאות הניסויים:")
@@ -76,39 +80,35 @@ def demonstrate_independence():
     
     # ניסוי: בדיקת השפעת היסטוריה על תוצאות עתידיות
     n_experiments = 10000
-    sequences_after_5_heads = []
-    
-    print(f"ניסוי: בדיקת {n_experiments:,} רצפים של 6 הטלות")
-    print("מחפשים רצפים שמתחילים ב-5 ראשים ובודקים את ההטלה השישית")
-    
-    count_5_heads_then_heads = 0
-    count_5_heads_then_tails = 0
-    
-    for _ in range(n_experiments):
-        # יצירת רצף של 6 הטלות
-        sequence = [random.choice(['H', 'T']) for _ in range(6)]
-        
-        # בדיקה אם 5 הראשונות הן ראשים
-        if sequence[:5] == ['H', 'H', 'H', 'H', 'H']:
-            if sequence[5] == 'H':
-                count_5_heads_then_heads += 1
-            else:
-                count_5_heads_then_tails += 1
-    
-    total_5_heads = count_5_heads_then_heads + count_5_heads_then_tails
-    
-    if total_5_heads > 0:
-        prob_heads_after_5 = count_5_heads_then_heads / total_5_heads
-        prob_tails_after_5 = count_5_heads_then_tails / total_5_heads
-        
-        print(f"\nתוצאות:")
-        print(f"מספר רצפים של 5 ראשים: {total_5_heads}")
-        print(f"מתוכם, ההטלה השישית:")
-        print(f"  ראש: {count_5_heads_then_heads} ({prob_heads_after_5:.3f})")
-        print(f"  עץ: {count_5_heads_then_tails} ({prob_tails_after_5:.3f})")
-        print(f"\nמסקנה: גם אחרי 5 ראשים, ההסתברות עדיין קרובה ל-0.5!")
-    else:
-        print("לא נמצאו רצפים של 5 ראשים בניסוי זה")
+    pattern = 'HHHHH'
+    
+    print(f"ניסוי: {n_experiments:,} רצפים של 6 הטלות שמתחילים ב-5 ראשים")
+    print("ההטלות הראשונות קבועות (דגימה מותנית מדויקת), ורק ההטלה השישית מוגרלת")
+    
+    result = conditional.conditional_next_flip(n_experiments, pattern)
+    
+    print(f"\nתוצאות:")
+    print(f"מספר רצפים של 5 ראשים: {result['samples']:,}")
+    print(f"מתוכם, ההטלה השישית:")
+    print(f"  ראש: {result['heads']} ({result['probability']:.3f} ± {result['standard_error']:.3f})")
+    print(f"  עץ: {result['tails']} ({1 - result['probability']:.3f})")
+    print(f"\nמסקנה: גם אחרי 5 ראשים, ההסתברות עדיין קרובה ל-0.5!")
+    
+    # השוואה: דגימה וסינון של רצפים מלאים משאירה רק 1/32 מהם
+    rejection = conditional.rejection_next_flip(n_experiments, pattern)
+    print(f"\nלשם השוואה, הגרלת {n_experiments:,} רצפים מלאים וסינון משאירה רק "
+          f"{rejection['samples']} רצפים של 5 ראשים ({rejection['probability']:.3f} ± {rejection['standard_error']:.3f})")
+    target = 0.005
+    needed_conditional = conditional.draws_for_precision(target, pattern, method='conditional')
+    needed_rejection = conditional.draws_for_precision(target, pattern, method='rejection')
+    print(f"הגרלות הנדרשות לשגיאת תקן {target}: {needed_conditional:,} (מותנית) מול "
+          f"{needed_rejection:,} (סינון), פי {needed_rejection / needed_conditional:.0f}")
+    
+    # תנאי כללי יותר: דגימת חשיבות (importance sampling) עם מטבע מוטה לטובת התנאי
+    estimate = conditional.importance_next_flip(n_experiments, 'HH?HH')
+    print(f"\nדגימת חשיבות, רצפים מהצורה HH?HH: P(ראש בהטלה הבאה) = "
+          f"{estimate['probability']:.3f} ± {estimate['standard_error']:.3f} "
+          f"({estimate['effective_samples']:,.0f} דגימות אפקטיביות מתוך {n_experiments:,})")
 
 def visualize_law_of_large_numbers():
     """
@@ -141,50 +141,39 @@ def visualize_law_of_large_numbers():
     ax2.grid(True, alpha=0.3)
     
     # 3. סימולציה של כשל המהמר
-    # יצירת 1000 רצפים של 10 הטלות
-    n_sequences = 1000
-    sequence_length = 10
-    
-    heads_after_streaks = []
-    streak_lengths = []
-    
-    for _ in range(n_sequences):
-        sequence = [random.choice([0, 1]) for _ in range(sequence_length)]
-        
-        # חיפוש רצפי ראשים
-        current_streak = 0
-        for i, flip in enumerate(sequence):
-            if flip == 1:  # ראש
-                current_streak += 1
-            else:
-                if current_streak >= 2 and i < sequence_length:  # רצף של לפחות 2 ראשים
-                    streak_lengths.append(current_streak)
-                    # בדיקה מה קרה אחרי הרצף (אם יש הטלה נוספת)
-                    if i < sequence_length - 1:
-                        heads_after_streaks.append(sequence[i + 1])
-                current_streak = 0
-    
-    if heads_after_streaks:
-        heads_after_count = sum(heads_after_streaks)
-        total_after = len(heads_after_streaks)
-        prob_heads_after_streak = heads_after_count / total_after
+    # 100,000 רצפים של 100 הטלות, ארוזים בביטים ומנותחים וקטורית
+    n_sequences = 100000
+    sequence_length = 100
+    min_streak = 2
+    
+    max_length = 20
+    stats = streaks.streak_statistics(PackedFlips.random(n_sequences, sequence_length), max_length=max_length)
+    
+    # ההטלה שאחרי כל מקום שלפניו לפחות 2 ראשים ברצף
+    heads_after = stats['heads_after'][min_streak]
+    total_after = heads_after + stats['tails_after'][min_streak]
+    if total_after:
+        prob_heads_after_streak = heads_after / total_after
         
         ax3.bar(['ראש', 'עץ'], 
                [prob_heads_after_streak, 1 - prob_heads_after_streak],
                color=['#0047AB', '#3B82F6'])
         ax3.axhline(y=0.5, color='red', linestyle='--', linewidth=2, label='הסתברות תיאורטית')
         ax3.set_ylabel('הסתברות')
-        ax3.set_title('תוצאות אחרי רצפי ראשים')
+        ax3.set_title(f'תוצאות אחרי רצפי ראשים ({total_after:,} הטלות)')
         ax3.legend()
         ax3.set_ylim(0, 1)
     
-    # 4. התפלגות אורכי רצפים
-    if streak_lengths:
-        streak_counter = Counter(streak_lengths)
-        lengths = list(streak_counter.keys())
-        counts = list(streak_counter.values())
-        
-        ax4.bar(lengths, counts, color='#1E3A8A', alpha=0.7)
+    # 4. התפלגות אורכי רצפים (כולל רצפים שמסתיימים בסוף הסדרה)
+    lengths = np.arange(min_streak, stats['lengths'].size)
+    counts = stats['lengths'][min_streak:]
+    if counts.any():
+        # הערך הצפוי המדויק (האורך האחרון כולל את כל הרצפים הארוכים יותר)
+        expected = n_sequences * run_probabilities.expected_runs(sequence_length, max_length=max_length)
+        ax4.bar(lengths, counts, color='#1E3A8A', alpha=0.7, label='סימולציה')
+        ax4.plot(lengths, expected[min_streak:], 'o-', color='red', linewidth=2, label='חישוב מדויק')
+        ax4.set_yscale('log')
+        ax4.legend()
         ax4.set_xlabel('אורך רצף ראשים')
         ax4.set_ylabel('מספר רצפים')
         ax4.set_title('התפלגות אורכי רצפים')
@@ -229,8 +218,7 @@ def main():
 
 if __name__ == "__main__":
     # הגדרת זרע אקראי לשחזור תוצאות
-    random.seed(42)
-    np.random.seed(42)
+    samplers.seed(42)
     
     main()
 
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Content-Hashed Build of the Probability Presentation
+Minifies and fingerprints the slides and theme into dist/, rewriting every
+reference to the hashed file names
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+CSS and slide HTML files are minified and renamed to name.<hash>.ext, so
+they can be cached for a year (tools/serve.py sends them as immutable);
+only the entry point, index.html, and the data files keep their names and
+are revalidated with ETags. References are quoted strings and url()s in
+HTML, inline scripts and CSS that resolve to another asset, e.g.
+href="../css/cobalt-theme.css" or window.location.href = 'slide4.html'.
+
+A file's hash covers its own minified content and the hashed names it
+refers to, so a change renames every file that (indirectly) points to it.
+The slides refer to each other in a cycle (next/previous), which no
+content hash can express; each strongly connected group of files is
+therefore hashed as one unit, and a change in any slide renames them all.
+
+Minified HTML keeps the text of <pre>, <textarea> and .code-block elements
+(shown with white-space: pre-wrap) byte for byte; elsewhere only comments
+and the whitespace between tags are collapsed. dist/asset-manifest.json
+maps every source path to its output file, size and SHA-256.
+
+dist/sw.js is a service worker (tools/service-worker.js) that precaches
+every file of the build, listed with its content hash in
+dist/precache-manifest.json; index.html registers it. A new build
+downloads only the entries whose name or hash changed.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+
+import compress_assets
+
+# Project root and the output tree
+ROOT = compress_assets.ROOT
+DIST = os.path.join(ROOT, 'dist')
+
+# Files copied to dist/, relative to ROOT
+ASSET_PATTERNS = ['index.html', 'slides/*.html', 'css/*.css', 'data/*.json']
+
+# Build bookkeeping of generate_data.py, never fetched by the presentation
+EXCLUDED = {'data/build_manifest.json'}
+
+# Pages opened by URL, which keep their names
+ENTRY_POINTS = {'index.html'}
+
+# Extensions of files renamed to name.<hash>.ext
+FINGERPRINTED = ('.css', '.html')
+
+# Extensions of files whose references are rewritten
+REWRITTEN = ('.css', '.html')
+
+# Hex digits of the content hash in file names
+HASH_LENGTH = 10
+
+# Source path -> output file, size and digest, relative to dist/
+ASSET_MANIFEST = 'asset-manifest.json'
+
+# Slide -> data files manifest of generate_data.py, keyed by slide path
+SLIDE_MANIFEST = 'data/slide_data.json'
+
+# Service worker written next to index.html, and the template it is built from
+SERVICE_WORKER = 'sw.js'
+SERVICE_WORKER_TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'service-worker.js')
+
+# Precached {url, revision} entries, also inlined into the service worker
+PRECACHE_MANIFEST = 'precache-manifest.json'
+
+# Added to every entry point
+SERVICE_WORKER_REGISTRATION = (f"<script>if ('serviceWorker' in navigator) {{"
+                               f"navigator.serviceWorker.register('{SERVICE_WORKER}');}}</script>")
+
+# Quoted strings and unquoted CSS url()s that may name an asset
+REFERENCE = re.compile(r'''(["'])([^"'\s<>()]+)\1|url\(\s*([^"'\s)]+)\s*\)''')
+
+# Blocks whose contents the HTML minifier treats separately
+RAW_BLOCK = re.compile(r'(<(script|style)\b[^>]*>)(.*?)(</\2>)', re.IGNORECASE | re.DOTALL)
+
+# Elements whose text is rendered as written, kept verbatim by the HTML minifier
+PRESERVED_BLOCK = re.compile(r'<(pre|textarea)\b[^>]*>|<div\b[^>]*\bclass=["\'][^"\']*\bcode-block\b[^>]*>',
+                             re.IGNORECASE)
+
+DIV_TAG = re.compile(r'<(/?)div\b[^>]*>', re.IGNORECASE)
+
+# Stand-in for a block set aside during HTML minification; looks like a tag
+PLACEHOLDER = re.compile(r'<\x00(\d+)>')
+
+def minify_css(css):
+    """Strip comments and insignificant whitespace from a stylesheet"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    css = re.sub(r'\s+!important', '!important', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+def minify_js(js):
+    """Drop indentation, blank lines and comment lines outside template literals"""
+    lines = []
+    in_template = False
+    for line in js.splitlines():
+        stripped = line.strip()
+        if in_template:
+            lines.append(line)
+        elif stripped and not stripped.startswith('//'):
+            lines.append(stripped)
+        if len(re.findall(r'(?<!\\)`', line)) % 2:
+            in_template = not in_template
+    return '\n'.join(lines)
+
+def minify_markup(html):
+    """Drop comments and collapse the whitespace between tags"""
+    html = re.sub(r'<!--(?!\[if).*?-->', '', html, flags=re.DOTALL)
+    return re.sub(r'>\s+<', '>\n<', html).strip()
+
+def preserved_spans(html):
+    """(start, end) of every <pre>, <textarea> and .code-block element"""
+    position = 0
+    while True:
+        match = PRESERVED_BLOCK.search(html, position)
+        if match is None:
+            return
+        end = len(html)
+        if match.group(1):
+            close = re.compile(rf'</{match.group(1)}\s*>', re.IGNORECASE).search(html, match.end())
+            end = close.end() if close else end
+        else:
+            depth = 1
+            for tag in DIV_TAG.finditer(html, match.end()):
+                depth += -1 if tag.group(1) else 1
+                if depth == 0:
+                    end = tag.end()
+                    break
+        yield match.start(), end
+        position = end
+
+def minify_html(html):
+    """Minify a page, its inline scripts and styles; preformatted text is kept"""
+    blocks = []
+
+    def set_aside(text):
+        blocks.append(text)
+        return f'<\x00{len(blocks) - 1}>'
+
+    def minify_raw(match):
+        body = match.group(3)
+        body = minify_css(body) if match.group(2).lower() == 'style' else minify_js(body)
+        return set_aside(match.group(1) + body + match.group(4))
+
+    html = RAW_BLOCK.sub(minify_raw, html)
+    parts = []
+    position = 0
+    for start, end in preserved_spans(html):
+        parts.append(html[position:start])
+        parts.append(set_aside(html[start:end]))
+        position = end
+    parts.append(html[position:])
+    html = minify_markup(''.join(parts))
+    # Blocks may contain other set-aside blocks (scripts inside a <pre> wrapper)
+    while PLACEHOLDER.search(html):
+        html = PLACEHOLDER.sub(lambda match: blocks[int(match.group(1))], html)
+    return html
+
+MINIFIERS = {'.css': minify_css, '.html': minify_html}
+
+def find_references(text, path, assets):
+    """(start, end, target) of every string in text that names another asset"""
+    references = []
+    base = posixpath.dirname(path)
+    for match in REFERENCE.finditer(text):
+        group = 2 if match.group(2) is not None else 3
+        value = match.group(group).split('#')[0].split('?')[0]
+        if not value or '://' in value or value.startswith(('/', 'data:')):
+            continue
+        target = posixpath.normpath(posixpath.join(base, value))
+        if target in assets and target != path:
+            references.append((match.start(group), match.start(group) + len(value), target))
+    return references
+
+def rewrite(text, path, references, names):
+    """text with every reference replaced by the relative output name"""
+    base = posixpath.dirname(path)
+    parts = []
+    position = 0
+    for start, end, target in references:
+        parts.append(text[position:start])
+        parts.append(posixpath.relpath(names[target], base or '.'))
+        position = end
+    parts.append(text[position:])
+    return ''.join(parts)
+
+def strongly_connected_components(graph):
+    """Tarjan's algorithm; components come out dependencies first"""
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    def visit(node):
+        index[node] = low[node] = len(index)
+        stack.append(node)
+        on_stack.add(node)
+        for neighbour in sorted(graph[node]):
+            if neighbour not in index:
+                visit(neighbour)
+                low[node] = min(low[node], low[neighbour])
+            elif neighbour in on_stack:
+                low[node] = min(low[node], index[neighbour])
+        if low[node] == index[node]:
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component.append(member)
+                if member == node:
+                    break
+            components.append(sorted(component))
+
+    for node in sorted(graph):
+        if node not in index:
+            visit(node)
+    return components
+
+def hashed_name(path, digest):
+    """slides/slide1.html -> slides/slide1.<digest>.html"""
+    stem, extension = posixpath.splitext(path)
+    return f'{stem}.{digest[:HASH_LENGTH]}{extension}'
+
+def precache_entries(manifest):
+    """
+    Service worker precache entries: content-hashed files are versioned by
+    their URL, all others by a revision hash of their content.
+    """
+    entries = []
+    for path, entry in manifest.items():
+        revision = None if entry['file'] != path else entry['sha256'][:HASH_LENGTH]
+        entries.append({'url': entry['file'], 'revision': revision})
+    return entries
+
+def write_service_worker(dist, manifest):
+    """Write the precache manifest and the service worker that embeds it"""
+    entries = precache_entries(manifest)
+    compress_assets.write_bytes(os.path.join(dist, PRECACHE_MANIFEST),
+                                (json.dumps(entries, indent=1) + '\n').encode('utf-8'))
+    with open(SERVICE_WORKER_TEMPLATE, encoding='utf-8') as f:
+        template = f.read()
+    script = f"const PRECACHE_MANIFEST = {json.dumps(entries, separators=(',', ':'))};\n\n{template}"
+    compress_assets.write_bytes(os.path.join(dist, SERVICE_WORKER), script.encode('utf-8'))
+    return entries
+
+def build(root=ROOT, dist=DIST, verbose=True):
+    """
+    Write the fingerprinted tree to dist and return the asset manifest,
+    {source path: {'file', 'size', 'sha256'}}.
+    """
+    assets = [path for path in compress_assets.find_assets(root, ASSET_PATTERNS) if path not in EXCLUDED]
+    sources = {}
+    for path in assets:
+        with open(os.path.join(root, path), 'rb') as f:
+            data = f.read()
+        extension = posixpath.splitext(path)[1]
+        if extension in MINIFIERS:
+            data = MINIFIERS[extension](data.decode('utf-8')).encode('utf-8')
+        if path in ENTRY_POINTS:
+            data = data.replace(b'</body>', SERVICE_WORKER_REGISTRATION.encode('utf-8') + b'\n</body>')
+        sources[path] = data
+
+    references = {path: find_references(sources[path].decode('utf-8'), path, sources)
+                  if path.endswith(REWRITTEN) else [] for path in assets}
+    graph = {path: {target for _, _, target in references[path]} for path in assets}
+
+    # Dependencies first, so every name outside a component is known when it is hashed
+    names = {path: path for path in assets}
+    contents = {}
+    for component in strongly_connected_components(graph):
+        digest = hashlib.sha256()
+        for path in component:
+            external = sorted(names[target] for target in graph[path] if target not in component)
+            digest.update(path.encode('utf-8') + b'\0' + sources[path] + b'\0' + '\0'.join(external).encode('utf-8'))
+        for path in component:
+            fingerprinted = path.endswith(FINGERPRINTED) and path not in ENTRY_POINTS
+            names[path] = hashed_name(path, hashlib.sha256(digest.digest() + path.encode('utf-8')).hexdigest()) \
+                if fingerprinted else path
+        for path in component:
+            contents[path] = rewrite(sources[path].decode('utf-8'), path, references[path], names).encode('utf-8') \
+                if references[path] else sources[path]
+
+    # The data manifest is keyed by the slides' paths, which have changed
+    if SLIDE_MANIFEST in contents:
+        slides = json.loads(contents[SLIDE_MANIFEST])
+        contents[SLIDE_MANIFEST] = json.dumps({names.get(slide, slide): entry for slide, entry in slides.items()},
+                                              ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    if os.path.isdir(dist):
+        shutil.rmtree(dist)
+    manifest = {}
+    for path in assets:
+        output = os.path.join(dist, names[path])
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        compress_assets.write_bytes(output, contents[path])
+        manifest[path] = {'file': names[path], 'size': len(contents[path]),
+                          'sha256': hashlib.sha256(contents[path]).hexdigest()}
+        if verbose:
+            with open(os.path.join(root, path), 'rb') as f:
+                original = len(f.read())
+            print(f"✓ {names[path]}: {original:,} -> {len(contents[path]):,} bytes")
+    compress_assets.write_bytes(os.path.join(dist, ASSET_MANIFEST),
+                                (json.dumps(manifest, indent=1) + '\n').encode('utf-8'))
+    write_service_worker(dist, manifest)
+    return manifest
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Build the minified, content-hashed dist/ tree")
+    parser.add_argument('--dist', default=DIST,
+                        help="output directory (default: dist/)")
+    parser.add_argument('--compress', action='store_true',
+                        help="also write .gz/.br variants (tools/compress_assets.py)")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="worker processes for --compress (default: 1)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Build dist/ and print a summary"""
+    args = parse_args(argv)
+    manifest = build(dist=args.dist)
+    total = sum(entry['size'] for entry in manifest.values())
+    hashed = sum(entry['file'] != path for path, entry in manifest.items())
+    print(f"\n{len(manifest)} assets, {total:,} bytes, {hashed} with content-hashed names")
+    if args.compress:
+        compress_assets.compress_tree(root=args.dist, patterns=ASSET_PATTERNS + [SERVICE_WORKER], jobs=args.jobs, verbose=False)
+        print(f"Compressed variants: {os.path.join(args.dist, compress_assets.COMPRESSION_MANIFEST)}")
+    print(f"Manifest: {os.path.join(args.dist, ASSET_MANIFEST)}")
+    print(f"Service worker: {os.path.join(args.dist, SERVICE_WORKER)} "
+          f"({len(manifest)} precached entries in {PRECACHE_MANIFEST})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Precompressed Static Assets for the Probability Presentation
+Writes maximum-level .gz and .br variants of every served file, once, at
+build time
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+Every asset matched by ASSET_PATTERNS gets a gzip (level 9) and a Brotli
+(quality 11, text mode, 16 MB window) variant next to it, e.g.
+data/advanced_visualization_data.json.br. A variant is only kept when it
+is smaller than the original. COMPRESSION_MANIFEST records the size and
+SHA-256 of every original, the size of each variant and the encodings that
+were tried but not kept, so a server can pick the smallest acceptable
+encoding without touching the disk, and so unchanged assets are only
+recompressed when the set of available encodings changes.
+
+Brotli needs the optional `brotli` package; without it only .gz variants
+are written.
+"""
+
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError:  # optional: .br variants are skipped
+    brotli = None
+
+# Project root, the directory that is served
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Served assets, relative to ROOT
+ASSET_PATTERNS = ['index.html', 'slides/*.html', 'css/*.css', 'data/*.json']
+
+# Sizes and digests of the originals and their variants, relative to ROOT
+COMPRESSION_MANIFEST = 'compression_manifest.json'
+
+# File suffix of each content coding
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+def compress_gzip(data):
+    """gzip at level 9 with a zero mtime, so the bytes are reproducible"""
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def compress_brotli(data):
+    """Brotli at maximum quality with the largest window"""
+    return brotli.compress(data, mode=brotli.MODE_TEXT, quality=11, lgwin=24)
+
+def available_encodings():
+    """Content codings this build can produce, best first"""
+    return [name for name in ENCODINGS if name != 'br' or brotli is not None]
+
+COMPRESSORS = {'br': compress_brotli, 'gzip': compress_gzip}
+
+def find_assets(root=ROOT, patterns=ASSET_PATTERNS):
+    """Sorted asset paths relative to root"""
+    paths = set()
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(root, pattern)):
+            if os.path.isfile(path):
+                paths.add(os.path.relpath(path, root).replace(os.sep, '/'))
+    return sorted(paths)
+
+def write_bytes(path, data):
+    """Atomically replace path with data, keeping it untouched if equal"""
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+def compress_asset(root, path, encodings):
+    """Write the variants of one asset; returns its manifest entry"""
+    with open(os.path.join(root, path), 'rb') as f:
+        data = f.read()
+    entry = {'size': len(data), 'sha256': hashlib.sha256(data).hexdigest(),
+             'encodings': {}, 'not_smaller': []}
+    for name in encodings:
+        variant_path = os.path.join(root, path + ENCODINGS[name])
+        compressed = COMPRESSORS[name](data)
+        if len(compressed) < len(data):
+            write_bytes(variant_path, compressed)
+            entry['encodings'][name] = len(compressed)
+        else:
+            entry['not_smaller'].append(name)
+            if os.path.exists(variant_path):
+                os.remove(variant_path)
+    return path, entry
+
+def is_current(root, path, entry, encodings):
+    """Whether a manifest entry still describes the asset and its variants"""
+    if entry is None:
+        return False
+    # Every available encoding was either written or found not to pay off
+    tried = set(entry['encodings']) | set(entry.get('not_smaller', []))
+    if tried != set(encodings):
+        return False
+    source = os.path.join(root, path)
+    if os.path.getsize(source) != entry['size']:
+        return False
+    with open(source, 'rb') as f:
+        if hashlib.sha256(f.read()).hexdigest() != entry['sha256']:
+            return False
+    return all(os.path.exists(source + ENCODINGS[name]) and
+               os.path.getsize(source + ENCODINGS[name]) == size
+               for name, size in entry['encodings'].items())
+
+def load_manifest(root=ROOT):
+    """The compression manifest, or an empty one"""
+    path = os.path.join(root, COMPRESSION_MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def compress_tree(root=ROOT, patterns=ASSET_PATTERNS, jobs=1, force=False, verbose=True):
+    """
+    Precompress every asset under root and write the manifest.
+
+    Assets whose digest and variants match the previous manifest are
+    skipped unless force is set. Returns the new manifest.
+    """
+    encodings = available_encodings()
+    previous = load_manifest(root)
+    assets = find_assets(root, patterns)
+    manifest = {}
+    pending = []
+    for path in assets:
+        entry = previous.get(path)
+        if not force and is_current(root, path, entry, encodings):
+            manifest[path] = entry
+        else:
+            pending.append(path)
+
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(compress_asset, [root] * len(pending), pending,
+                                    [encodings] * len(pending)))
+    else:
+        results = [compress_asset(root, path, encodings) for path in pending]
+    for path, entry in results:
+        manifest[path] = entry
+        if verbose:
+            sizes = ', '.join(f"{name} {size:,}" for name, size in entry['encodings'].items())
+            print(f"✓ {path}: {entry['size']:,} bytes -> {sizes or 'kept uncompressed'}")
+
+    # Variants of assets that no longer exist
+    for path in set(previous) - set(manifest):
+        for suffix in ENCODINGS.values():
+            if os.path.exists(os.path.join(root, path + suffix)):
+                os.remove(os.path.join(root, path + suffix))
+
+    manifest = {path: manifest[path] for path in sorted(manifest)}
+    write_bytes(os.path.join(root, COMPRESSION_MANIFEST),
+                (json.dumps(manifest, indent=1) + '\n').encode('utf-8'))
+    return manifest
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Write .gz/.br variants of the presentation assets")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="number of worker processes (default: 1)")
+    parser.add_argument('--force', action='store_true',
+                        help="recompress even unchanged assets")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Precompress all assets and print a size summary"""
+    args = parse_args(argv)
+    if brotli is None:
+        print("• brotli is not installed, writing .gz variants only (pip install brotli)")
+    manifest = compress_tree(jobs=args.jobs, force=args.force)
+
+    total = sum(entry['size'] for entry in manifest.values())
+    print(f"\n{len(manifest)} assets, {total:,} bytes uncompressed")
+    for name in available_encodings():
+        best = sum(entry['encodings'].get(name, entry['size']) for entry in manifest.values())
+        print(f"  {name:5s} {best:,} bytes ({best / total:.1%})")
+    print(f"Manifest: {COMPRESSION_MANIFEST}")
+
+if __name__ == "__main__":
+    main()
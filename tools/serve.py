@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Local Presentation Server
+asyncio static file server with strong ETags, precompressed content
+negotiation, byte ranges and an in-memory LRU file cache
+
+Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+כל הזכויות שמורות לד"ר יורם סגל
+
+Replaces `python -m http.server` for serving the presentation:
+
+- every response carries a strong ETag (a content hash), so a browser that
+  already has the file gets a 304 Not Modified without a body,
+- file names with a content hash (e.g. app.3f9a1c2e.css) are sent with a
+  one-year immutable Cache-Control, everything else with no-cache, i.e.
+  "revalidate with the ETag",
+- Accept-Encoding is negotiated against the .br/.gz variants written by
+  tools/compress_assets.py; a variant is used only while
+  compression_manifest.json lists it with the size and SHA-256 of the
+  current source, so an edited (or merely touched) file is never answered
+  with a stale or missing variant,
+- single byte ranges (Range / If-Range) are answered with 206,
+- file contents and their ETags are kept in an LRU cache bounded in bytes
+  and revalidated against the file's size and mtime on every request.
+
+Only the files the presentation loads are served (PUBLISHED): index.html,
+the slides, their stylesheets and the JSON datasets, plus the service
+worker of a build. Scripts, sources and build metadata under the same
+root answer 404, so the server can listen on the whole network.
+
+Connections are HTTP/1.1 keep-alive and handled by one event loop, so a
+room full of clients costs coroutines rather than threads.
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from urllib.parse import unquote, urlsplit
+
+from compress_assets import COMPRESSION_MANIFEST
+
+# Project root, the directory that is served by default
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PORT = 8080
+
+# Upper bound of the in-memory file cache
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Seconds an idle keep-alive connection stays open
+KEEP_ALIVE_TIMEOUT = 15
+
+# Longest accepted request head
+MAX_HEADER_BYTES = 16 * 1024
+
+# Files the presentation loads, relative to the served root (sw.js exists
+# only in a build written by tools/build.py)
+PUBLISHED = ['index.html', 'sw.js', 'slides/*.html', 'css/*.css', 'data/*.json']
+
+# Build metadata matched by PUBLISHED that no page loads
+UNPUBLISHED = {'data/build_manifest.json'}
+
+# Precompressed variants by content coding, in order of preference
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+# name.<hash>.ext, as written by content-hashing bundlers
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8,64}\.[A-Za-z0-9]+$')
+
+CACHE_IMMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_REVALIDATE = 'no-cache'
+
+REASONS = {
+    200: 'OK', 206: 'Partial Content', 304: 'Not Modified', 400: 'Bad Request',
+    403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed',
+    416: 'Range Not Satisfiable', 431: 'Request Header Fields Too Large',
+}
+
+mimetypes.add_type('application/json', '.json')
+mimetypes.add_type('text/javascript', '.js')
+mimetypes.add_type('application/manifest+json', '.webmanifest')
+
+class CachedFile:
+    """Contents of one file with the stat key they were read under"""
+
+    __slots__ = ('key', 'data', 'digest', 'etag')
+
+    def __init__(self, key, data):
+        self.key = key
+        self.data = data
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.etag = '"' + self.digest[:32] + '"'
+
+class FileCache:
+    """LRU cache of file contents, bounded by their total size in bytes"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, stat):
+        """The file at path; read again only if its size or mtime changed"""
+        key = (stat.st_size, stat.st_mtime_ns)
+        entry = self.entries.get(path)
+        if entry is not None and entry.key == key:
+            self.entries.move_to_end(path)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        with open(path, 'rb') as f:
+            entry = CachedFile(key, f.read())
+        self._store(path, entry)
+        return entry
+
+    def _store(self, path, entry):
+        old = self.entries.pop(path, None)
+        if old is not None:
+            self.size -= len(old.data)
+        if len(entry.data) > self.max_bytes:
+            return
+        self.entries[path] = entry
+        self.size += len(entry.data)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted.data)
+
+def parse_accept_encoding(header):
+    """{coding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for item in header.split(','):
+        parts = [part.strip() for part in item.split(';')]
+        if not parts[0]:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[parts[0].lower()] = q
+    return accepted
+
+def acceptable_encodings(header):
+    """Precompressed codings the client accepts, best first"""
+    accepted = parse_accept_encoding(header or '')
+    default = accepted.get('*', 0.0)
+    candidates = [(accepted.get(coding, default), -rank, coding)
+                  for rank, coding in enumerate(ENCODINGS)]
+    return [coding for q, _, coding in sorted(candidates, reverse=True) if q > 0]
+
+def parse_range(header, size):
+    """
+    (start, stop) of a single 'bytes=' range, None to ignore the header
+    (malformed or multiple ranges) or 'unsatisfiable'.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, dash, last = spec.strip().partition('-')
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            stop = min(int(last) + 1, size) if last else size
+            if int(last or start) < start:
+                return None
+        elif last:
+            start, stop = max(size - int(last), 0), size
+            if int(last) == 0:
+                return 'unsatisfiable'
+        else:
+            return None
+    except ValueError:
+        return None
+    if start >= size:
+        return 'unsatisfiable'
+    return start, stop
+
+def etag_matches(header, etag):
+    """Whether an If-None-Match header matches etag (weak comparison)"""
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+def is_published(name):
+    """Whether a '/' separated path relative to the root is a presentation file"""
+    if name in UNPUBLISHED:
+        return False
+    parts = name.split('/')
+    return any(len(parts) == len(pattern.split('/')) and
+               all(fnmatch.fnmatchcase(part, glob) for part, glob in zip(parts, pattern.split('/')))
+               for pattern in PUBLISHED)
+
+def cache_control(path):
+    """Immutable caching for content-hashed file names, revalidation otherwise"""
+    return CACHE_IMMUTABLE if HASHED_NAME.search(os.path.basename(path)) else CACHE_REVALIDATE
+
+class PresentationServer:
+    """Serves the presentation files under root over HTTP/1.1"""
+
+    def __init__(self, root=ROOT, cache_bytes=DEFAULT_CACHE_BYTES, quiet=False):
+        self.root = os.path.realpath(root)
+        self.cache = FileCache(cache_bytes)
+        self.quiet = quiet
+        self.manifest = {}
+        self.manifest_key = None
+
+    def resolve(self, target):
+        """Filesystem path of a request target, or None if not servable"""
+        path = unquote(urlsplit(target).path)
+        parts = [part for part in path.split('/') if part not in ('', '.')]
+        if any(part == '..' or part.startswith('.') or '\\' in part or '\0' in part for part in parts):
+            return None
+        full = os.path.join(self.root, *parts)
+        if os.path.isdir(full):
+            full = os.path.join(full, 'index.html')
+        full = os.path.realpath(full)
+        if os.path.commonpath([full, self.root]) != self.root or not os.path.isfile(full):
+            return None
+        if not is_published(os.path.relpath(full, self.root).replace(os.sep, '/')):
+            return None
+        return full
+
+    def compression_manifest(self):
+        """The compression manifest of root, read again whenever it changes"""
+        path = os.path.join(self.root, COMPRESSION_MANIFEST)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return {}
+        key = (stat.st_size, stat.st_mtime_ns)
+        if key != self.manifest_key:
+            try:
+                with open(path, 'rb') as f:
+                    self.manifest = json.loads(f.read())
+            except (OSError, ValueError):
+                self.manifest = {}
+            self.manifest_key = key
+        return self.manifest
+
+    def select_variant(self, path, source, accept_encoding):
+        """
+        (path, stat, coding) of the best precompressed variant of source (the
+        cached original), or None. A variant is fresh only if the manifest
+        entry matches the original's size and digest and the variant's size.
+        """
+        name = os.path.relpath(path, self.root).replace(os.sep, '/')
+        entry = self.compression_manifest().get(name)
+        if (not isinstance(entry, dict) or entry.get('size') != len(source.data)
+                or entry.get('sha256') != source.digest):
+            return None
+        for coding in acceptable_encodings(accept_encoding):
+            if coding not in entry.get('encodings', {}):
+                continue
+            variant = path + ENCODINGS[coding]
+            try:
+                variant_stat = os.stat(variant)
+            except OSError:
+                continue
+            if variant_stat.st_size == entry['encodings'][coding]:
+                return variant, variant_stat, coding
+        return None
+
+    def respond(self, method, target, headers):
+        """(status, headers, body) for a parsed request"""
+        if method not in ('GET', 'HEAD'):
+            return 405, {'Allow': 'GET, HEAD'}, b''
+        path = self.resolve(target)
+        if path is None:
+            return 404, {'Content-Type': 'text/plain; charset=utf-8'}, b'Not Found\n'
+
+        stat = os.stat(path)
+        content_type, _ = mimetypes.guess_type(path)
+        content_type = content_type or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/json', 'text/javascript'):
+            content_type += '; charset=utf-8'
+        response = {
+            'Content-Type': content_type,
+            'Cache-Control': cache_control(path),
+            'Vary': 'Accept-Encoding',
+            'Last-Modified': formatdate(stat.st_mtime, usegmt=True),
+            'Accept-Ranges': 'bytes',
+        }
+
+        entry = self.cache.get(path, stat)
+        variant = self.select_variant(path, entry, headers.get('accept-encoding'))
+        if variant is not None:
+            path, stat, coding = variant
+            response['Content-Encoding'] = coding
+            entry = self.cache.get(path, stat)
+        # Each representation has its own strong validator
+        etag = entry.etag if variant is None else entry.etag[:-1] + '-' + variant[2] + '"'
+        response['ETag'] = etag
+
+        if_none_match = headers.get('if-none-match')
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            return 304, response, b''
+
+        data = entry.data
+        byte_range = headers.get('range')
+        if_range = headers.get('if-range')
+        if byte_range is not None and (if_range is None or if_range.strip() == etag):
+            byte_range = parse_range(byte_range, len(data))
+            if byte_range == 'unsatisfiable':
+                return 416, {'Content-Range': f'bytes */{len(data)}'}, b''
+            if byte_range is not None:
+                start, stop = byte_range
+                response['Content-Range'] = f'bytes {start}-{stop - 1}/{len(data)}'
+                return 206, response, memoryview(data)[start:stop]
+        return 200, response, data
+
+    async def handle(self, reader, writer):
+        """Serve requests on one keep-alive connection"""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_TIMEOUT)
+                except asyncio.LimitOverrunError:
+                    await self.send(writer, 'GET', 431, {}, b'', keep_alive=False)
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                request = lines[0].split()
+                if len(request) != 3 or not request[2].startswith('HTTP/'):
+                    await self.send(writer, 'GET', 400, {}, b'', keep_alive=False)
+                    break
+                method, target, version = request
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(':')
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = ('close' not in connection if version == 'HTTP/1.1'
+                              else 'keep-alive' in connection)
+                status, response, body = self.respond(method, target, headers)
+                await self.send(writer, method, status, response, body, keep_alive, version)
+                self.log(method, target, status, len(body))
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def send(self, writer, method, status, headers, body, keep_alive=True, version='HTTP/1.1'):
+        """Write one response; HEAD and 304 responses carry no body"""
+        lines = [f'{version} {status} {REASONS[status]}',
+                 f'Date: {formatdate(time.time(), usegmt=True)}',
+                 'Server: probability-presentation',
+                 f'Connection: {"keep-alive" if keep_alive else "close"}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        if status != 304:
+            lines.append(f'Content-Length: {len(body)}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if method != 'HEAD' and status != 304 and body:
+            writer.write(body)
+        await writer.drain()
+
+    def log(self, method, target, status, size):
+        if not self.quiet:
+            print(f'{time.strftime("%H:%M:%S")} {status} {method} {target} {size}', file=sys.stderr)
+
+    async def serve(self, host, port):
+        """Serve until cancelled"""
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        names = ', '.join(f'http://{sock.getsockname()[0]}:{sock.getsockname()[1]}' for sock in server.sockets)
+        print(f'Serving {self.root} on {names}')
+        async with server:
+            await server.serve_forever()
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Serve the presentation locally")
+    parser.add_argument('--port', '-p', type=int, default=DEFAULT_PORT,
+                        help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument('--bind', '-b', default='127.0.0.1',
+                        help="address to bind, 0.0.0.0 for the whole network (default: 127.0.0.1)")
+    parser.add_argument('--root', default=ROOT,
+                        help="directory to serve (default: the project root)")
+    parser.add_argument('--cache-mb', type=float, default=DEFAULT_CACHE_BYTES / 2 ** 20,
+                        help="in-memory file cache size in MB (default: 64)")
+    parser.add_argument('--quiet', '-q', action='store_true',
+                        help="do not log requests")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Run the server until interrupted"""
+    args = parse_args(argv)
+    server = PresentationServer(args.root, int(args.cache_mb * 2 ** 20), args.quiet)
+    try:
+        asyncio.run(server.serve(args.bind, args.port))
+    except KeyboardInterrupt:
+        print(f'\nStopped ({server.cache.hits} cache hits, {server.cache.misses} misses)')
+
+if __name__ == "__main__":
+    main()
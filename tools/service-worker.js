@@ -0,0 +1,80 @@
+/*
+ * Service Worker of the Probability Presentation
+ * Precaches every page, stylesheet and dataset of the build and serves them
+ * from the cache, so slide navigation works offline
+ *
+ * Copyright (c) 2025 Dr. Yoram Segal. All rights reserved.
+ * כל הזכויות שמורות לד"ר יורם סגל
+ *
+ * tools/build.py writes dist/sw.js as `const PRECACHE_MANIFEST = [...]`
+ * followed by this file. Each entry is {url, revision}: content-hashed files
+ * have a null revision (their URL changes with their content), the others
+ * carry the hash of their content. Entries are cached under url?__rev=...,
+ * so installing a new build downloads only the entries whose URL or
+ * revision changed, and activation deletes the ones no longer listed.
+ */
+
+const CACHE_NAME = 'probability-presentation-precache';
+
+function cacheKey(entry) {
+    const url = new URL(entry.url, self.registration.scope);
+    if (entry.revision) {
+        url.searchParams.set('__rev', entry.revision);
+    }
+    return url.href;
+}
+
+// Request URL (without query or hash) -> cache key
+const PRECACHED = new Map(PRECACHE_MANIFEST.map(entry => [
+    new URL(entry.url, self.registration.scope).href, cacheKey(entry)
+]));
+
+self.addEventListener('install', event => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(CACHE_NAME);
+        await Promise.all(PRECACHE_MANIFEST.map(async entry => {
+            const key = cacheKey(entry);
+            if (await cache.match(key)) {
+                return;
+            }
+            // Bypass the HTTP cache, which may hold an older revision
+            const response = await fetch(new URL(entry.url, self.registration.scope), { cache: 'reload' });
+            if (!response.ok) {
+                throw new Error(`Precaching ${entry.url} failed: ${response.status}`);
+            }
+            await cache.put(key, response);
+        }));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(CACHE_NAME);
+        const current = new Set(PRECACHED.values());
+        const keys = await cache.keys();
+        await Promise.all(keys.filter(request => !current.has(request.url))
+                              .map(request => cache.delete(request)));
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', event => {
+    if (event.request.method !== 'GET') {
+        return;
+    }
+    const url = new URL(event.request.url);
+    url.search = '';
+    url.hash = '';
+    if (url.href === self.registration.scope) {
+        url.href = new URL('index.html', self.registration.scope).href;
+    }
+    const key = PRECACHED.get(url.href);
+    if (!key) {
+        return;
+    }
+    event.respondWith((async () => {
+        const cached = await caches.match(key, { cacheName: CACHE_NAME });
+        return cached || fetch(event.request);
+    })());
+});